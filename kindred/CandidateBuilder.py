@@ -1,22 +1,117 @@
 
 from collections import defaultdict
+import heapq
 import itertools
+import math
+import multiprocessing
+import random
+import time
 
 import kindred
 
+_workerCandidateBuilder = None
+_workerCorpus = None
+
+def _initCandidateWorker(candidateBuilder,corpus):
+	global _workerCandidateBuilder, _workerCorpus
+	_workerCandidateBuilder = candidateBuilder
+	_workerCorpus = corpus
+
+def _getCandidatesInWorker(docIndices):
+	# Only the compact candidate records are sent back to the main process (which attaches them to the corpus)
+	return [ _workerCandidateBuilder._getDocumentCandidates(_workerCorpus.documents[docIndex]) for docIndex in docIndices ]
+
+def _getDependencyPathLengths(sentence,entityPairs):
+	# Gets the number of dependency edges on the shortest path between a token of each entity for each pair of entities
+	# (which is missing for pairs with no path). Each entity is searched from once (breadth-first from all of its tokens).
+	neighbours = defaultdict(list)
+	for a,b,_ in sentence.dependencies:
+		neighbours[a].append(b)
+		neighbours[b].append(a)
+
+	distancesFromEntities = {}
+	pathLengths = {}
+	for pair in entityPairs:
+		entityID1,entityID2 = pair
+		if not entityID1 in distancesFromEntities:
+			distances = { t:0 for t in sentence.entityIDToLoc[entityID1] }
+			toVisit = list(distances.keys())
+			while len(toVisit) > 0:
+				nextToVisit = []
+				for a in toVisit:
+					for b in neighbours[a]:
+						if not b in distances:
+							distances[b] = distances[a] + 1
+							nextToVisit.append(b)
+				toVisit = nextToVisit
+			distancesFromEntities[entityID1] = distances
+
+		distances = distancesFromEntities[entityID1]
+		lengths = [ distances[t] for t in sentence.entityIDToLoc[entityID2] if t in distances ]
+		if len(lengths) > 0:
+			pathLengths[pair] = min(lengths)
+	return pathLengths
+
 class CandidateBuilder:
 	"""
 	Generates set of all possible relations in corpus.
 	"""
-	def __init__(self,acceptedEntityPairs=None):
+
+	# Defaults for candidate builders pickled before these options were added
+	limits = None
+	acceptedPartnerTypes = None
+	maxTokenDistance = None
+	maxDependencyPathLength = None
+	maxCandidatesPerSentence = None
+	prunedCounts = None
+	negativeFraction = None
+	negativeRatio = None
+	stratifyNegatives = False
+	randomSeed = 1
+
+	def __init__(self,acceptedEntityPairs=None,limits=None,maxTokenDistance=None,maxDependencyPathLength=None,maxCandidatesPerSentence=None,negativeFraction=None,negativeRatio=None,stratifyNegatives=False,randomSeed=1):
 		"""
 		Constructor
 
 		:param acceptedEntityPairs: Pairs of entities that candidate relations must match. None will match all candidate relations.
+		:param limits: Optional limits on the size of documents and the time spent building candidates for each one. Documents that go over them are quarantined (and get no candidates)
+		:param maxTokenDistance: Maximum distance (in tokens) between the closest tokens of the two entities of a candidate relation (e.g. 1 for entities next to each other). None will not limit this
+		:param maxDependencyPathLength: Maximum number of dependency edges on the shortest path between a token of each entity of a candidate relation. Entities with no path between them are pruned. None will not limit this
+		:param maxCandidatesPerSentence: Maximum number of candidate relations to keep for each sentence. The pairs of entities closest together (in tokens) are kept. None will not limit this
+		:param negativeFraction: Fraction of the negative candidates (i.e. with class 0) to randomly keep when building candidates for training with fit_transform. All positive candidates are kept. Each kept negative is given a weight (see CandidateSet.weights) for the ones it stands in for. None will keep them all
+		:param negativeRatio: Alternative to negativeFraction that keeps (at most) this many negative candidates for each positive one. If there are no positive candidates, all the negative ones are kept
+		:param stratifyNegatives: Whether to sample the negative candidates separately for each combination of entity types, so that rare combinations are still included
+		:param randomSeed: Seed for the random sampling of negative candidates
 		:type acceptedEntityPairs: list of tuples
+		:type limits: kindred.ProcessingLimits
+		:type maxTokenDistance: int
+		:type maxDependencyPathLength: int
+		:type maxCandidatesPerSentence: int
+		:type negativeFraction: float
+		:type negativeRatio: float
+		:type stratifyNegatives: bool
+		:type randomSeed: int
 		"""
 		self.fitted = False
 
+		assert negativeFraction is None or (isinstance(negativeFraction,(int,float)) and 0 < negativeFraction <= 1), "negativeFraction must be None or a number between 0 and 1"
+		assert negativeRatio is None or (isinstance(negativeRatio,(int,float)) and negativeRatio > 0), "negativeRatio must be None or a positive number"
+		assert negativeFraction is None or negativeRatio is None, "Only one of negativeFraction and negativeRatio can be used"
+		self.negativeFraction = negativeFraction
+		self.negativeRatio = negativeRatio
+		self.stratifyNegatives = stratifyNegatives
+		self.randomSeed = randomSeed
+
+		for name,limit in [('maxTokenDistance',maxTokenDistance),('maxDependencyPathLength',maxDependencyPathLength),('maxCandidatesPerSentence',maxCandidatesPerSentence)]:
+			assert limit is None or (isinstance(limit,int) and limit >= 0), "%s must be None or a non-negative integer" % name
+		self.maxTokenDistance = maxTokenDistance
+		self.maxDependencyPathLength = maxDependencyPathLength
+		self.maxCandidatesPerSentence = maxCandidatesPerSentence
+		self.prunedCounts = {}
+
+		assert limits is None or isinstance(limits,kindred.ProcessingLimits)
+		self.limits = limits
+
 		assert acceptedEntityPairs is None or isinstance(acceptedEntityPairs,list)
 		if acceptedEntityPairs is None:
 			self.acceptedEntityPairs = None
@@ -25,20 +120,155 @@ class CandidateBuilder:
 				assert isinstance(acceptedEntityPair,tuple)
 				assert len(acceptedEntityPair) == 2
 			self.acceptedEntityPairs = set(acceptedEntityPairs)
+			self.acceptedPartnerTypes = self._getAcceptedPartnerTypes()
+
+	def _getAcceptedPartnerTypes(self):
+		# The types of entity that each type can be paired with (as the first entity of a relation)
+		acceptedPartnerTypes = defaultdict(set)
+		for firstType,secondType in self.acceptedEntityPairs:
+			acceptedPartnerTypes[firstType].add(secondType)
+		return acceptedPartnerTypes
+
+	def _getEntityPairs(self,sentence):
+		# Gets the pairs of entities in a sentence that can be candidate relations (in the same order as itertools.permutations).
+		# With accepted entity pairs, the entities are put into buckets by type so only the pairs of accepted types are looked at.
+		entityIDs = sentence.getEntityIDs()
+		if self.acceptedEntityPairs is None:
+			return itertools.permutations(entityIDs,2)
+		if self.acceptedPartnerTypes is None:
+			self.acceptedPartnerTypes = self._getAcceptedPartnerTypes()
+
+		entityTypes = [ sentence.getEntityType(eID) for eID in entityIDs ]
+		indicesByType = defaultdict(list)
+		for i,entityType in enumerate(entityTypes):
+			indicesByType[entityType].append(i)
+
+		# Merge the buckets of the types that each type can be paired with (keeping the order of the entities in the sentence)
+		partnerIndicesByType = {}
+		for firstType in indicesByType:
+			partnerTypes = self.acceptedPartnerTypes.get(firstType,[])
+			partnerIndicesByType[firstType] = list(heapq.merge(*[ indicesByType[t] for t in partnerTypes if t in indicesByType ]))
+
+		pairs = []
+		for i,(entityID,entityType) in enumerate(zip(entityIDs,entityTypes)):
+			for j in partnerIndicesByType[entityType]:
+				if i != j:
+					pairs.append((entityID,entityIDs[j]))
+		return pairs
+
+	def _pruneEntityPairs(self,sentence,entityPairs,existingRelations,prunedCounts):
+		# Removes the pairs of entities that are too far apart (or over the cap for the sentence) and counts them (and how many were annotated relations)
+		def prune(reason,pairsToPrune):
+			candidateCount,relationCount = prunedCounts.get(reason,(0,0))
+			relationCount += sum( 1 for pair in pairsToPrune if pair in existingRelations )
+			prunedCounts[reason] = (candidateCount+len(pairsToPrune),relationCount)
+
+		entityPairs = list(entityPairs)
+
+		tokenDistances = {}
+		for pair in entityPairs:
+			pos1 = sentence.entityIDToLoc[pair[0]]
+			pos2 = sentence.entityIDToLoc[pair[1]]
+			tokenDistances[pair] = max(0, min(pos2)-max(pos1), min(pos1)-max(pos2))
+
+		if not self.maxTokenDistance is None:
+			prune('maxTokenDistance', [ pair for pair in entityPairs if tokenDistances[pair] > self.maxTokenDistance ])
+			entityPairs = [ pair for pair in entityPairs if tokenDistances[pair] <= self.maxTokenDistance ]
+
+		if not self.maxDependencyPathLength is None:
+			pathLengths = _getDependencyPathLengths(sentence,entityPairs)
+			tooLong = set( pair for pair in entityPairs if not pair in pathLengths or pathLengths[pair] > self.maxDependencyPathLength )
+			prune('maxDependencyPathLength', [ pair for pair in entityPairs if pair in tooLong ])
+			entityPairs = [ pair for pair in entityPairs if not pair in tooLong ]
+
+		if not self.maxCandidatesPerSentence is None and len(entityPairs) > self.maxCandidatesPerSentence:
+			# Keep the closest pairs (and the earliest of pairs equally far apart) but in the same order as before
+			closestFirst = sorted(range(len(entityPairs)), key=lambda i : tokenDistances[entityPairs[i]])
+			toKeep = set(closestFirst[:self.maxCandidatesPerSentence])
+			prune('maxCandidatesPerSentence', [ pair for i,pair in enumerate(entityPairs) if not i in toKeep ])
+			entityPairs = [ pair for i,pair in enumerate(entityPairs) if i in toKeep ]
+
+		return entityPairs
+
+	def _sampleNegatives(self,corpus,candidateEntityIDs,candidateClasses):
+		# Chooses which candidates to keep (all the positives and a seeded random sample of the negatives) and gives
+		# each kept negative a weight for the number of negatives (in its group) that it stands in for
+		if self.stratifyNegatives:
+			entityMapping = corpus.getEntityMapping()
+
+		negativeGroups = defaultdict(list)
+		positiveCount = 0
+		for i,(entityIDs,candidateClass) in enumerate(zip(candidateEntityIDs,candidateClasses)):
+			if candidateClass == [0]:
+				if self.stratifyNegatives:
+					groupKey = tuple( entityMapping[eID].entityType for eID in entityIDs )
+				else:
+					groupKey = None
+				negativeGroups[groupKey].append(i)
+			else:
+				positiveCount += 1
+
+		negativeCount = sum( len(group) for group in negativeGroups.values() )
+		groupKeys = sorted(negativeGroups.keys())
+		if self.negativeFraction is None and positiveCount == 0:
+			# There are no positives to keep a ratio of negatives to, so none are sampled
+			fraction,maxNegativeCount = 1.0,negativeCount
+		elif self.negativeFraction is None:
+			fraction = 1.0 if negativeCount == 0 else min(1.0, self.negativeRatio * positiveCount / float(negativeCount))
+			maxNegativeCount = int(math.floor(self.negativeRatio * positiveCount))
+		else:
+			fraction,maxNegativeCount = self.negativeFraction,negativeCount
+
+		# Each group keeps its share (rounded up) but the groups that were rounded up the most are trimmed so that the total stays within the ratio
+		keepCounts = { groupKey:min(len(negativeGroups[groupKey]), int(math.ceil(fraction * len(negativeGroups[groupKey])))) for groupKey in groupKeys }
+		roundedUpFirst = sorted(groupKeys, key=lambda groupKey : keepCounts[groupKey] - fraction*len(negativeGroups[groupKey]), reverse=True)
+		while sum(keepCounts.values()) > maxNegativeCount:
+			for groupKey in roundedUpFirst:
+				if sum(keepCounts.values()) > maxNegativeCount and keepCounts[groupKey] > 0:
+					keepCounts[groupKey] -= 1
+
+		weights = [ 1.0 for _ in candidateClasses ]
+		toKeep = set( i for i,candidateClass in enumerate(candidateClasses) if candidateClass != [0] )
+		randomGenerator = random.Random(self.randomSeed)
+		for groupKey in groupKeys:
+			group = negativeGroups[groupKey]
+			keepCount = keepCounts[groupKey]
+			if keepCount == 0:
+				continue
+			for i in randomGenerator.sample(group,keepCount):
+				toKeep.add(i)
+				weights[i] = len(group) / float(keepCount)
+
+		return [ i in toKeep for i in range(len(candidateClasses)) ],weights
 
-	def fit_transform(self,corpus):
+	def getPrunedCounts(self):
+		"""
+		Get the number of candidate relations removed by each of the pruning options (maxTokenDistance, maxDependencyPathLength and maxCandidatesPerSentence) in the last call to transform (or fit_transform), along with how many of them were annotated relations. This can be used to check how much pruning affects recall.
+
+		:return: Dictionary from the name of each pruning option used to a tuple of the number of candidates pruned and how many of them were annotated relations
+		:rtype: dict
+		"""
+
+		if self.prunedCounts is None:
+			return {}
+		return dict(self.prunedCounts)
+
+	def fit_transform(self,corpus,nWorkers=1):
 		"""
 		Creates the set of all possible relations that exist within the given corpus and adds these to the corpus under each kindred.Sentence instance. Each relation will be contained within a single sentence. This fitting function should be called the first time in order to initialise the set of known relationship types.
 		
 		:param corpus: Corpus of text with which to build relation candidates
+		:param nWorkers: Number of worker processes to build the candidates with (each taking shards of the documents). 1 will build them in the current process. The candidates are the same (and in the same order) either way
 		:type corpus: kindred.Corpus
+		:type nWorkers: int
 		"""
 
 		assert self.fitted == False, "CandidateBuilder has already been fit to corpus"
 		assert isinstance(corpus,kindred.Corpus)
+		assert isinstance(nWorkers,int) and nWorkers > 0, "nWorkers must be a positive integer"
 
 		if not corpus.parsed:
-			parser = kindred.Parser()
+			parser = kindred.Parser(limits=self.limits)
 			parser.parse(corpus)
 		
 		self.relTypes = set()
@@ -56,53 +286,135 @@ class CandidateBuilder:
 			
 		self.fitted = True
 	
-		self.transform(corpus)
+		self._buildCandidates(corpus,sampleNegatives=True,nWorkers=nWorkers)
 
-	def transform(self,corpus):
+	def transform(self,corpus,nWorkers=1):
 		"""
 		Creates the set of all possible relations that exist within the given corpus and adds these to the corpus under each kindred.Sentence instance. Each relation will be contained within a single sentence.
 		
 		:param corpus: Corpus of text with which to build relation candidates
+		:param nWorkers: Number of worker processes to build the candidates with (each taking shards of the documents). 1 will build them in the current process. The candidates are the same (and in the same order) either way
 		:type corpus: kindred.Corpus
+		:type nWorkers: int
 		"""
 		assert self.fitted == True, "CandidateBuilder must be fit to corpus first"
 		assert isinstance(corpus,kindred.Corpus)
+		assert isinstance(nWorkers,int) and nWorkers > 0, "nWorkers must be a positive integer"
+
+		self._buildCandidates(corpus,sampleNegatives=False,nWorkers=nWorkers)
+
+	def _getDocumentCandidates(self,doc):
+		# Finds the candidates for one document without changing it (so that this can be run in a worker process). Gives back the reason
+		# to quarantine it (or None), the candidates as (sentenceIndex,entityIDs,classes) tuples, the number of candidates in each sentence
+		# and the number of candidates that were pruned
+		prunedCounts = {}
+
+		deadline = None
+		if not self.limits is None:
+			reason = self.limits.checkSentences(doc)
+			if not reason is None:
+				return reason,[],[],prunedCounts
+			deadline = self.limits.getDeadline()
+
+		existingRelations = defaultdict(list)
+		for r in doc.getRelations():
+			assert isinstance(r,kindred.Relation)
+			
+			entityIDs = tuple(r.entityIDs)
+			
+			relKey = tuple([r.relationType] + r.argNames)
+			if relKey in self.relClasses:
+				relationClass = self.relClasses[relKey]
+				existingRelations[entityIDs].append(relationClass)
+
+		usePruning = not (self.maxTokenDistance is None and self.maxDependencyPathLength is None and self.maxCandidatesPerSentence is None)
+
+		candidates = []
+		sentenceCounts = []
+		for sentenceIndex,sentence in enumerate(doc.sentences):
+			if not deadline is None and time.time() > deadline:
+				return "Ran out of time building candidate relations (limit is %s seconds)" % str(self.limits.maxSeconds),[],[],prunedCounts
+
+			entityPairs = self._getEntityPairs(sentence)
+			if usePruning:
+				entityPairs = self._pruneEntityPairs(sentence,entityPairs,existingRelations,prunedCounts)
+
+			countBefore = len(candidates)
+			for entitiesInRelation in entityPairs:
+				relKey = tuple(entitiesInRelation)
+				candidateClass = existingRelations[relKey] if relKey in existingRelations else [0]
+				candidates.append((sentenceIndex,relKey,candidateClass))
+			sentenceCounts.append(len(candidates)-countBefore)
 
+		return None,candidates,sentenceCounts,prunedCounts
+
+	def _getCandidatesWithWorkers(self,corpus,docIndices,nWorkers):
+		# Shards the documents across worker processes (which get the corpus when they start) and gives back the results in the
+		# same order as the documents. Shards are kept small enough that each worker gets several of them to balance the load.
+		shardSize = max(1,len(docIndices) // (4*nWorkers))
+		shards = [ docIndices[i:i+shardSize] for i in range(0,len(docIndices),shardSize) ]
+
+		pool = multiprocessing.Pool(nWorkers, initializer=_initCandidateWorker, initargs=(self,corpus))
+		try:
+			for shardResults in pool.imap(_getCandidatesInWorker, shards):
+				for result in shardResults:
+					yield result
+		finally:
+			pool.close()
+			pool.join()
+
+	def _buildCandidates(self,corpus,sampleNegatives,nWorkers):
 		if not corpus.parsed:
-			parser = kindred.Parser()
+			parser = kindred.Parser(limits=self.limits)
 			parser.parse(corpus)
 
-		for doc in corpus.documents:
-			existingRelations = defaultdict(list)
-			for r in doc.getRelations():
-				assert isinstance(r,kindred.Relation)
-				
-				entityIDs = tuple(r.entityIDs)
-				
-				relKey = tuple([r.relationType] + r.argNames)
-				if relKey in self.relClasses:
-					relationClass = self.relClasses[relKey]
-					existingRelations[entityIDs].append(relationClass)
-
-			for sentence in doc.sentences:
-				entitiesInSentence = sentence.getEntityIDs()
-							
-				for entitiesInRelation in itertools.permutations(entitiesInSentence,2):
-					candidateRelation = kindred.Relation(entityIDs=list(entitiesInRelation))
-					candidateClass = [0]
-					relKey = tuple(entitiesInRelation)
-					if relKey in existingRelations:
-						candidateClass = existingRelations[relKey]
-
-					includeCandidate = True
-					if not self.acceptedEntityPairs is None:
-						typesInRelation = tuple([ sentence.getEntityType(eID) for eID in entitiesInRelation ])
-						includeCandidate = (typesInRelation in self.acceptedEntityPairs)
-
-					if includeCandidate:
-						sentence.addCandidateRelation(candidateRelation,candidateClass)
-
-				sentence.candidateRelationsProcessed = True
+		self.prunedCounts = {}
+
+		docIndices = [ docIndex for docIndex,doc in enumerate(corpus.documents) if doc.quarantineReason is None ]
+		if nWorkers > 1 and len(docIndices) > 1:
+			results = self._getCandidatesWithWorkers(corpus,docIndices,nWorkers)
+		else:
+			results = ( self._getDocumentCandidates(corpus.documents[docIndex]) for docIndex in docIndices )
+
+		# The candidates for the whole corpus are gathered up (in the order of the documents) and stored together in a CandidateSet
+		documentIndices,sentenceIndices,candidateEntityIDs,candidateClasses = [],[],[],[]
+		sentenceRanges = []
+		for docIndex,(reason,candidates,sentenceCounts,prunedCounts) in zip(docIndices,results):
+			doc = corpus.documents[docIndex]
+			for pruneReason,(candidateCount,relationCount) in prunedCounts.items():
+				totalCandidateCount,totalRelationCount = self.prunedCounts.get(pruneReason,(0,0))
+				self.prunedCounts[pruneReason] = (totalCandidateCount+candidateCount,totalRelationCount+relationCount)
+
+			if not reason is None:
+				doc.quarantine(reason)
+				continue
+
+			start = len(candidateEntityIDs)
+			for sentence,sentenceCount in zip(doc.sentences,sentenceCounts):
+				sentenceRanges.append((sentence,start,start+sentenceCount))
+				start += sentenceCount
+
+			for sentenceIndex,relKey,candidateClass in candidates:
+				documentIndices.append(docIndex)
+				sentenceIndices.append(sentenceIndex)
+				candidateEntityIDs.append(relKey)
+				candidateClasses.append(candidateClass)
+
+		weights = None
+		if sampleNegatives and not (self.negativeFraction is None and self.negativeRatio is None):
+			toKeep,weights = self._sampleNegatives(corpus,candidateEntityIDs,candidateClasses)
+
+			# Drop the candidates that weren't sampled and move each sentence's range to match
+			keptBefore = [0]
+			for keep in toKeep:
+				keptBefore.append(keptBefore[-1] + (1 if keep else 0))
+			documentIndices,sentenceIndices,candidateEntityIDs,candidateClasses,weights = [ [ x for x,keep in zip(values,toKeep) if keep ] for values in [documentIndices,sentenceIndices,candidateEntityIDs,candidateClasses,weights] ]
+			sentenceRanges = [ (sentence,keptBefore[start],keptBefore[end]) for sentence,start,end in sentenceRanges ]
+
+		candidateSet = kindred.CandidateSet(documentIndices,sentenceIndices,candidateEntityIDs,candidateClasses,weights)
+		for sentence,start,end in sentenceRanges:
+			sentence._setCandidateSetRange(candidateSet,start,end)
+			sentence.candidateRelationsProcessed = True
 					
 		corpus.addRelationTypes(self.relTypes)
 
@@ -0,0 +1,102 @@
+import numpy
+
+import kindred
+
+class CandidateSet:
+	"""
+	Set of candidate relations (e.g. all of those in a corpus) stored as parallel NumPy arrays instead of as individual kindred.Relation objects. For each candidate, it stores the index of the document (in the corpus) and sentence (in the document) that it is in, the IDs of its entities, its classes (indices of relation types with 0 meaning no relation) and its weight for training. kindred.Relation objects are only created when they are asked for. CandidateBuilder creates one of these and Corpus.getCandidateSet gets it.
+	"""
+
+	def __init__(self,documentIndices,sentenceIndices,entityIDs,classes,weights=None):
+		"""
+		Create a set of candidate relations
+
+		:param documentIndices: Index of the document that each candidate is in
+		:param sentenceIndices: Index of the sentence (within its document) that each candidate is in
+		:param entityIDs: The entity IDs of each candidate (which should all have the same number of entities)
+		:param classes: List of classes for each candidate
+		:param weights: Optional weight for each candidate when training (e.g. for negative candidates that were sampled and stand in for others). None will give each a weight of one
+		:type documentIndices: list of ints
+		:type sentenceIndices: list of ints
+		:type entityIDs: list of tuples
+		:type classes: list of lists of ints
+		:type weights: list of floats
+		"""
+
+		assert len(documentIndices) == len(sentenceIndices) == len(entityIDs) == len(classes)
+		assert weights is None or len(weights) == len(classes)
+		arity = len(entityIDs[0]) if len(entityIDs) > 0 else 2
+		assert all( len(eIDs) == arity for eIDs in entityIDs ), "All candidate relations must have the same number of entities"
+
+		self.documentIndices = numpy.array(documentIndices, dtype=numpy.int32)
+		self.sentenceIndices = numpy.array(sentenceIndices, dtype=numpy.int32)
+		self.entityIDs = numpy.array(entityIDs, dtype=numpy.int64).reshape((len(entityIDs),arity))
+
+		# The classes of candidate i are classValues[classOffsets[i]:classOffsets[i+1]]
+		self.classOffsets = numpy.cumsum([0] + [ len(c) for c in classes ]).astype(numpy.int64)
+		self.classValues = numpy.array([ c for candidateClasses in classes for c in candidateClasses ], dtype=numpy.int32)
+
+		if weights is None:
+			self.weights = numpy.ones(len(classes), dtype=numpy.float64)
+		else:
+			self.weights = numpy.array(weights, dtype=numpy.float64)
+
+	def __len__(self):
+		return len(self.documentIndices)
+
+	def getRelation(self,index):
+		"""
+		Get a candidate relation
+
+		:param index: Index of the candidate
+		:type index: int
+		:return: The candidate relation (with no relation type)
+		:rtype: kindred.Relation
+		"""
+
+		return kindred.Relation._createTrusted(entityIDs=self.entityIDs[index].tolist())
+
+	def getRelations(self):
+		"""
+		Get all the candidate relations
+
+		:return: List of the candidate relations
+		:rtype: list of kindred.Relation
+		"""
+
+		return [ kindred.Relation._createTrusted(entityIDs=entityIDs) for entityIDs in self.entityIDs.tolist() ]
+
+	def getClasses(self):
+		"""
+		Get the classes (i.e. indices of relation types) for all the candidates
+
+		:return: List of the classes for each candidate. 0 means no relation type
+		:rtype: list of lists of ints
+		"""
+
+		classValues = self.classValues.tolist()
+		offsets = self.classOffsets.tolist()
+		return [ classValues[start:end] for start,end in zip(offsets,offsets[1:]) ]
+
+	def getClassesForCandidate(self,index):
+		"""
+		Get the classes for one candidate
+
+		:param index: Index of the candidate
+		:type index: int
+		:return: The classes for the candidate. 0 means no relation type
+		:rtype: list of ints
+		"""
+
+		return self.classValues[self.classOffsets[index]:self.classOffsets[index+1]].tolist()
+
+	def getFirstClasses(self):
+		"""
+		Get the first class of each candidate (which is what the RelationClassifier trains with)
+
+		:return: Array of the first class of each candidate
+		:rtype: numpy.ndarray
+		"""
+
+		return self.classValues[self.classOffsets[:-1]]
+
@@ -0,0 +1,119 @@
+import numpy
+import six
+
+import kindred
+
+class _ColumnView(object):
+	# Read-only list-like view that creates each item from the sentence's arrays when it is asked for
+	def __init__(self,size,makeItem):
+		self._size = size
+		self._makeItem = makeItem
+
+	def __len__(self):
+		return self._size
+
+	def __getitem__(self,index):
+		if isinstance(index,slice):
+			return [ self._makeItem(i) for i in range(*index.indices(self._size)) ]
+		if index < 0:
+			index += self._size
+		if index < 0 or index >= self._size:
+			raise IndexError("index out of range")
+		return self._makeItem(index)
+
+	def __iter__(self):
+		for i in range(self._size):
+			yield self._makeItem(i)
+
+	def __eq__(self,other):
+		return list(self) == list(other)
+
+	def __ne__(self,other):
+		return not self.__eq__(other)
+
+	def __repr__(self):
+		return repr(list(self))
+
+class ColumnarSentence(kindred.Sentence):
+	"""
+	Sentence that stores its tokens and dependencies in compact NumPy arrays instead of as lists of Python objects. Words, lemmas, part-of-speech tags and dependency types are stored as IDs in a StringTable that is shared with the other sentences of a corpus. The tokens and dependencies can still be used as lists (of kindred.Token objects and (tokenindex1,tokenindex2,dependency_type) tuples) but these are created when they are needed. A Parser creates these with columnarSentences=True.
+	"""
+
+	def __init__(self, text, tokenInfo, dependencies, entitiesWithLocations, stringTable, sourceFilename=None, textOffsets=None):
+		"""
+		Constructor for ColumnarSentence class
+
+		:param text: Text of the sentence (or of the whole document if textOffsets is given)
+		:param tokenInfo: List of information about each token in the sentence. Should be a list of tuples with form (word,lemma,partofspeech,startPos,endPos)
+		:param dependencies: List of dependencies from dependency path. Should be a list of tuples with form (tokenindex1,tokenindex2,dependency_type)
+		:param entitiesWithLocations: List of entities associated with tokens. Should be a list of tuples with form (kindred.Entity, list of tokenindices)
+		:param stringTable: String table (shared with other sentences) to store words, lemmas, part-of-speech tags and dependency types in
+		:param sourceFilename: Filename of the source document
+		:param textOffsets: Optional (startPos,endPos) of the sentence within text, so that the sentence refers to the document text instead of storing a copy
+		:type text: str
+		:type tokenInfo: list of tuples
+		:type dependencies: list of tuples
+		:type entitiesWithLocations: list of tuples
+		:type stringTable: kindred.StringTable
+		:type sourceFilename: str
+		:type textOffsets: tuple
+		"""
+
+		assert isinstance(text, six.string_types)
+		assert textOffsets is None or (isinstance(textOffsets,tuple) and len(textOffsets) == 2 and 0 <= textOffsets[0] <= textOffsets[1] <= len(text)), "textOffsets must be a (startPos,endPos) tuple within the text"
+		assert isinstance(tokenInfo, list)
+		assert isinstance(dependencies, list)
+		assert isinstance(entitiesWithLocations, list)
+		assert isinstance(stringTable, kindred.StringTable)
+
+		for entity,locs in entitiesWithLocations:
+			assert isinstance(entity,kindred.Entity)
+			for l in locs:
+				assert l >= 0 and l < len(tokenInfo), "Entity location must be an index of one of the tokens"
+
+		self._setAttributes(text, tokenInfo, dependencies, entitiesWithLocations, stringTable, sourceFilename, textOffsets)
+
+	def _setAttributes(self, text, tokenInfo, dependencies, entitiesWithLocations, stringTable, sourceFilename=None, textOffsets=None):
+		getID = stringTable.getID
+		self._setText(text,textOffsets)
+		self.stringTable = stringTable
+		self.wordIDs = numpy.array([ getID(word) for word,_,_,_,_ in tokenInfo ], dtype=numpy.int32)
+		self.lemmaIDs = numpy.array([ getID(lemma) for _,lemma,_,_,_ in tokenInfo ], dtype=numpy.int32)
+		self.partofspeechIDs = numpy.array([ getID(partofspeech) for _,_,partofspeech,_,_ in tokenInfo ], dtype=numpy.int32)
+		self.startPositions = numpy.array([ startPos for _,_,_,startPos,_ in tokenInfo ], dtype=numpy.int32)
+		self.endPositions = numpy.array([ endPos for _,_,_,_,endPos in tokenInfo ], dtype=numpy.int32)
+
+		self.dependencyHeads = numpy.array([ a for a,_,_ in dependencies ], dtype=numpy.int32)
+		self.dependencyChildren = numpy.array([ b for _,b,_ in dependencies ], dtype=numpy.int32)
+		self.dependencyTypeIDs = numpy.array([ getID(dependencyType) for _,_,dependencyType in dependencies ], dtype=numpy.int32)
+
+		self.entitiesWithLocations = entitiesWithLocations
+		self.sourceFilename = sourceFilename
+
+		self.entityIDToType = { e.entityID:e.entityType for e,_ in self.entitiesWithLocations }
+		self.entityIDToLoc = { e.entityID:loc for e,loc in self.entitiesWithLocations }
+
+		self.candidateRelationsWithClasses = []
+		self.candidateRelationsProcessed = False
+
+	def _makeToken(self,i):
+		getString = self.stringTable.getString
+		return kindred.Token(getString(self.wordIDs[i]),getString(self.lemmaIDs[i]),getString(self.partofspeechIDs[i]),int(self.startPositions[i]),int(self.endPositions[i]))
+
+	def _makeDependency(self,i):
+		return (int(self.dependencyHeads[i]),int(self.dependencyChildren[i]),self.stringTable.getString(self.dependencyTypeIDs[i]))
+
+	@property
+	def tokens(self):
+		"""
+		The tokens of the sentence (as a list-like view that creates each kindred.Token when needed)
+		"""
+		return _ColumnView(len(self.wordIDs),self._makeToken)
+
+	@property
+	def dependencies(self):
+		"""
+		The dependencies of the sentence (as a list-like view of (tokenindex1,tokenindex2,dependency_type) tuples)
+		"""
+		return _ColumnView(len(self.dependencyHeads),self._makeDependency)
+
@@ -1,10 +1,14 @@
 import kindred
 import random
+import warnings
 
-class Corpus:
+class Corpus(object):
 	"""
 	Collection of text documents.
 	"""
+
+	# Default for corpora pickled before they had a string table (see _getStringTable)
+	stringTable = None
 	
 	def __init__(self,text=None):
 		"""
@@ -15,24 +19,64 @@ class Corpus:
 		"""
 
 		self.documents = []
+
+		# Used to intern the strings of the corpus (and shared by the sentences if they are stored as ColumnarSentences)
+		self.stringTable = kindred.StringTable()
+
 		if not text is None:
 			doc = kindred.Document(text)
 			self.addDocument(doc)
-		self.parsed = False
 
 		self.relationTypes = None
 
 	def addDocument(self,doc):
 		"""
-		Add a single document to the corpus
+		Add a single document to the corpus. The types of its entities and relations (and argument names) are interned in the string table of the corpus
 		
 		:param doc: Document to add
 		:type doc: kindred.Document
 		"""
 
 		assert isinstance(doc,kindred.Document)
+
+		intern = self._getStringTable().intern
+		for e in doc.entities:
+			e.entityType = intern(e.entityType)
+		for r in doc.relations:
+			if not r.relationType is None:
+				r.relationType = intern(r.relationType)
+			if not r.argNames is None:
+				r.argNames = [ intern(a) for a in r.argNames ]
+
 		self.documents.append(doc)
 
+	def _getStringTable(self):
+		# The string table of the corpus (which is created if the corpus was pickled before it had one)
+		if self.stringTable is None:
+			self.stringTable = kindred.StringTable()
+		return self.stringTable
+
+	@property
+	def parsed(self):
+		"""
+		Whether every document in the corpus has been parsed (with its current text) or quarantined
+		"""
+		return all( doc.isParsed() or not doc.quarantineReason is None for doc in self.documents )
+
+	@parsed.setter
+	def parsed(self,value):
+		# Previously the parsed flag was set by the Parser. It is now worked out from the documents so setting it does nothing
+		warnings.warn("Corpus.parsed is worked out from the documents and can no longer be set", DeprecationWarning, stacklevel=2)
+
+	def getQuarantinedDocuments(self):
+		"""
+		Get the documents that have been quarantined for going over a processing limit (see kindred.ProcessingLimits)
+
+		:return: List of tuples of each quarantined document with the reason
+		:rtype: list of (kindred.Document,str)
+		"""
+
+		return [ (doc,doc.quarantineReason) for doc in self.documents if not doc.quarantineReason is None ]
 
 	def addRelationTypes(self,relationTypes):
 		"""
@@ -57,6 +101,47 @@ class Corpus:
 			cloned.addDocument(doc.clone())
 		return cloned
 	
+	def getCandidateSet(self):
+		"""
+		Get all the candidate relations in this corpus (with their classes) as a kindred.CandidateSet. This is the one created by the CandidateBuilder if it is still up to date (or a new one made from the candidates in the sentences otherwise)
+
+		:return: The candidate relations in this corpus
+		:rtype: kindred.CandidateSet
+		"""
+
+		# Check whether the sentences still hold all of a CandidateSet from the CandidateBuilder (in order)
+		candidateSet = None
+		isUpToDate = True
+		position = 0
+		for docIndex,doc in enumerate(self.documents):
+			for sentenceIndex,sentence in enumerate(doc.sentences):
+				assert sentence.candidateRelationsProcessed == True, "CandidateBuilder use to get candidate relations first"
+				if sentence.candidateSetRange is None:
+					isUpToDate = isUpToDate and sentence.getCandidateCount() == 0
+					continue
+
+				sentenceCandidateSet,start,end = sentence.candidateSetRange
+				if candidateSet is None:
+					candidateSet = sentenceCandidateSet
+				if sentenceCandidateSet is not candidateSet or start != position:
+					isUpToDate = False
+				elif end > start and (candidateSet.documentIndices[start] != docIndex or candidateSet.sentenceIndices[start] != sentenceIndex):
+					isUpToDate = False
+				position = end
+
+		if isUpToDate and not candidateSet is None and position == len(candidateSet):
+			return candidateSet
+
+		documentIndices,sentenceIndices,entityIDs,classes = [],[],[],[]
+		for docIndex,doc in enumerate(self.documents):
+			for sentenceIndex,sentence in enumerate(doc.sentences):
+				for relation,relationtypeClass in sentence.candidateRelationsWithClasses:
+					documentIndices.append(docIndex)
+					sentenceIndices.append(sentenceIndex)
+					entityIDs.append(relation.entityIDs)
+					classes.append(relationtypeClass)
+		return kindred.CandidateSet(documentIndices,sentenceIndices,entityIDs,classes)
+
 	def getCandidateClasses(self):
 		"""
 		Get all the classes (i.e. indices of relation types) for all the candidate relations in this corpus.
@@ -65,10 +150,7 @@ class Corpus:
 		:rtype: List of integers
 		"""
 
-		classes = []
-		for doc in self.documents:
-			classes += doc.getCandidateClasses()
-		return classes
+		return self.getCandidateSet().getClasses()
 		
 	def getCandidateRelations(self):
 		"""
@@ -78,10 +160,7 @@ class Corpus:
 		:rtype: List of kindred.Relation
 		"""
 
-		relations = []
-		for doc in self.documents:
-			relations += doc.getCandidateRelations()
-		return relations
+		return self.getCandidateSet().getRelations()
 		
 	def getEntityMapping(self):
 		"""
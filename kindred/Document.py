@@ -5,6 +5,10 @@ class Document:
 	"""
 	Span of text with associated tagged entities and relations between entities.
 	"""
+
+	# Defaults for documents pickled before these were added
+	parsedText = None
+	quarantineReason = None
 	
 	def __init__(self,text,entities=None,relations=None,relationsUseSourceIDs=True,sourceFilename=None,metadata={}):
 		"""
@@ -24,47 +28,55 @@ class Document:
 		:type metadata: dict
 		"""
 
-		loadFromSimpleTag = (entities is None)
-
-		self.sourceFilename = sourceFilename
-		self.metadata = metadata
-
-		if loadFromSimpleTag:
+		if entities is None:
 			dataToCopy = kindred.loadFunctions.parseSimpleTag(text)
-			self.text = dataToCopy.getText()
-			self.entities = dataToCopy.getEntities()
-			self.relations = dataToCopy.getRelations()
+			text = dataToCopy.getText()
+			entities = dataToCopy.getEntities()
+			relations = dataToCopy.getRelations()
+			relationsUseSourceIDs = False
 		else:
-			self.text = text
-			
 			assert isinstance(entities,list)
 			for e in entities:
 				assert isinstance(e,kindred.Entity)
-			self.entities = entities
 			
-			if relations is None:
-				self.relations = []
-			else:
+			if not relations is None:
 				assert isinstance(relations,list)
 				for r in relations:
 					assert isinstance(r,kindred.Relation)
-				self.relations = relations
+
+		self._setAttributes(text,entities,relations,relationsUseSourceIDs,sourceFilename,metadata)
+
+	@classmethod
+	def _createTrusted(cls,*args,**kwargs):
+		# Creates a document (with the same arguments as the constructor but with entities always given) without checking
+		# the types of the entities and relations, for use by kindred's own loaders
+		document = cls.__new__(cls)
+		document._setAttributes(*args,**kwargs)
+		return document
+
+	def _setAttributes(self,text,entities,relations=None,relationsUseSourceIDs=True,sourceFilename=None,metadata={}):
+		self.sourceFilename = sourceFilename
+		self.metadata = metadata
+		self.text = text
+		self.entities = entities
+		self.relations = [] if relations is None else relations
 
 		# We'll need to translate source IDs to internal IDs
-		if relationsUseSourceIDs and not loadFromSimpleTag:
+		if relationsUseSourceIDs:
 			sourceEntityIDsToEntityIDs = self.getSourceEntityIDsToEntityIDs()
-			sourceEntityIDs = sourceEntityIDsToEntityIDs.keys()
 			correctedRelations = []
 			for r in self.relations:
 				for e in r.entityIDs:
-					assert e in sourceEntityIDs, "Entities in relation must occur in the associated text. %s does not" % e
+					assert e in sourceEntityIDsToEntityIDs, "Entities in relation must occur in the associated text. %s does not" % e
 				relationEntityIDs = [ sourceEntityIDsToEntityIDs[e] for e in r.entityIDs ]
-				correctedR = kindred.Relation(r.relationType,relationEntityIDs,r.argNames)
+				correctedR = kindred.Relation._createTrusted(r.relationType,relationEntityIDs,r.argNames)
 				correctedRelations.append(correctedR)
 				
 			self.relations = correctedRelations
 
 		self.sentences = []
+		self.parsedText = None
+		self.quarantineReason = None
 		
 	def __repr__(self):
 		"""
@@ -116,6 +128,17 @@ class Document:
 		assert isinstance(sentence,kindred.Sentence)
 		self.sentences.append(sentence)
 		
+	def quarantine(self,reason):
+		"""
+		Mark the document as being over a processing limit (see kindred.ProcessingLimits). Its sentences (and any candidate relations) are removed and it will be skipped when parsing and building candidates.
+
+		:param reason: Why the document was quarantined
+		:type reason: str
+		"""
+
+		self.quarantineReason = reason
+		self.sentences = []
+
 	def clone(self):
 		"""
 		Clones the document
@@ -124,7 +147,7 @@ class Document:
 		:rtype: kindred.Document
 		"""
 
-		cloned = Document(self.text,entities=self.entities,relations=self.relations,relationsUseSourceIDs=False,sourceFilename=self.sourceFilename)
+		cloned = Document._createTrusted(self.text,entities=self.entities,relations=self.relations,relationsUseSourceIDs=False,sourceFilename=self.sourceFilename)
 		return cloned
 
 	def getCandidateClasses(self):
@@ -247,6 +270,18 @@ class Document:
 		
 		return self.text
 
+	def isParsed(self):
+		"""
+		Whether this document has been parsed. A document whose text has changed since it was parsed will need to be parsed again. Documents that have had sentences added directly (and not through a Parser) are considered parsed.
+		
+		:return: Whether the document has been parsed
+		:rtype: bool
+		"""
+
+		if self.parsedText is None:
+			return len(self.sentences) > 0
+		return self.parsedText == self.text
+
 	def removeRelations(self):
 		"""
 		Remove all relations in this corpus
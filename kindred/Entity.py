@@ -1,9 +1,11 @@
 import six
 
-class Entity:
+class Entity(object):
 	"""
 	Biomedical entity with information of location in text
 	"""
+
+	__slots__ = ['entityType','sourceEntityID','externalID','text','position','entityID']
 	
 	_nextInternalID = 1
 
@@ -33,7 +35,17 @@ class Entity:
 			assert len(p) == 2, posErrorMsg
 			assert isinstance(p[0],int), posErrorMsg
 			assert isinstance(p[1],int), posErrorMsg
-	
+
+		self._setAttributes(entityType,text,position,sourceEntityID,externalID)
+
+	@classmethod
+	def _createTrusted(cls,*args,**kwargs):
+		# Creates an entity (with the same arguments as the constructor) without checking them, for use by kindred's own loaders
+		entity = cls.__new__(cls)
+		entity._setAttributes(*args,**kwargs)
+		return entity
+
+	def _setAttributes(self,entityType,text,position,sourceEntityID=None,externalID=None):
 		self.entityType = entityType
 		self.sourceEntityID = sourceEntityID
 		self.externalID = externalID
@@ -56,10 +68,23 @@ class Entity:
 	def __eq__(self, other):
 		"""Override the default Equals behavior"""
 		if isinstance(other, self.__class__):
-			return self.__dict__ == other.__dict__
+			return self._getKey() == other._getKey()
 		return False
 	
 	def __ne__(self, other):
 		"""Define a non-equality test"""
 		return not self.__eq__(other)
 
+	def _getKey(self):
+		return (self.entityType,self.sourceEntityID,self.externalID,self.text,self.position,self.entityID)
+
+	def __hash__(self):
+		return hash((self.entityType,self.text,tuple(self.position),self.entityID))
+
+	def __getstate__(self):
+		return { name:getattr(self,name) for name in Entity.__slots__ }
+
+	def __setstate__(self, state):
+		for name,value in state.items():
+			setattr(self,name,value)
+
@@ -3,28 +3,32 @@ import numpy as np
 from sklearn.linear_model import LogisticRegression
 
 class LogisticRegressionWithThreshold:
-	def __init__(self,threshold=0.5):
+	def __init__(self,threshold=0.5,classWeight='balanced'):
 		"""
 		Set up a Logistic Regression classifier that can use a different threshold for predictions and thereby be more lenient (lower threshold, false positives increase, false negatives decrease) or more conservative (higher threshold, false positives decrease, false negative increase).
 		
 		:param threshold: Threshold to use, should be between 0 and 1
+		:param classWeight: Weights for each class (as a dictionary) or 'balanced' to weight them inversely to how often they occur
 		:type threshold: float
+		:type classWeight: dict or str
 		"""
 
-		self.clf = LogisticRegression(class_weight='balanced',random_state=1)
+		self.clf = LogisticRegression(class_weight=classWeight,random_state=1)
 		self.threshold = threshold
 
-	def fit(self,X,Y):
+	def fit(self,X,Y,sample_weight=None):
 		"""
 		Train the classifier using the associated matrix X and classes Y. Class zero should represent no associated class.
 		
 		:param X: Training vector
 		:param Y: Associated class for each row of X
+		:param sample_weight: Optional weight for each row of X
 		:type X: sparse matrix
 		:type Y: matrix
+		:type sample_weight: array
 		"""
 
-		self.clf.fit(X,Y)
+		self.clf.fit(X,Y,sample_weight=sample_weight)
 		self.classes_ = self.clf.classes_
 
 	def predict(self,X):
@@ -0,0 +1,151 @@
+import os
+import hashlib
+import pickle
+import tempfile
+import six
+
+import kindred
+
+class ParseCache:
+	"""
+	On-disk cache of parsed text (sentences, tokens and dependencies) that can be used by a Parser to avoid reparsing text that it has already seen. Each entry is keyed by a hash of the text, the parsing model and the version of kindred. The cache has a maximum size and the least recently used entries are removed once it is full. The number of lookups that were found (hits) and not found (misses) in the cache are counted.
+	"""
+
+	def __init__(self,directory,maxSize=1024*1024*1024):
+		"""
+		Create a cache in the given directory (which will be created if needed). Existing entries in the directory will be reused.
+
+		:param directory: Directory to store the cached parses in
+		:param maxSize: Maximum size of the cache (in bytes)
+		:type directory: str
+		:type maxSize: int
+		"""
+
+		assert isinstance(maxSize,int) and maxSize > 0, "maxSize must be a positive integer"
+
+		self.directory = os.path.abspath(os.path.expanduser(directory))
+		self.maxSize = maxSize
+		self.hits = 0
+		self.misses = 0
+
+		if not os.path.isdir(self.directory):
+			os.makedirs(self.directory)
+
+		self.currentSize = sum( size for _,size,_ in self._listEntries() )
+
+	def _listEntries(self):
+		entries = []
+		for root,dirs,files in os.walk(self.directory):
+			for filename in files:
+				if filename.endswith('.pickle'):
+					path = os.path.join(root,filename)
+					try:
+						info = os.stat(path)
+					except OSError:
+						continue
+					entries.append((info.st_mtime,info.st_size,path))
+		return entries
+
+	def _getPath(self,text,modelName):
+		hasher = hashlib.sha256()
+		for part in [kindred.__version__,modelName,text]:
+			if isinstance(part,six.text_type):
+				part = part.encode('utf8')
+			hasher.update(part)
+			hasher.update(b'\0')
+		key = hasher.hexdigest()
+		return os.path.join(self.directory,key[:2],key+'.pickle')
+
+	def get(self,text,modelName):
+		"""
+		Get the cached parse for a text (or None if it is not in the cache)
+
+		:param text: Text that was parsed
+		:param modelName: Name (and version) of the model used for parsing
+		:type text: str
+		:type modelName: str
+		:return: The parsed sentences that were stored for this text, or None if not in the cache
+		:rtype: list
+		"""
+
+		path = self._getPath(text,modelName)
+		try:
+			with open(path,'rb') as f:
+				parsedSentences = pickle.load(f)
+		except (IOError,OSError,EOFError,pickle.UnpicklingError,AttributeError,ImportError,IndexError,KeyError,TypeError,ValueError):
+			# A missing entry or one that can't be unpickled (e.g. corrupted or written by a different version) is treated as a miss
+			self.misses += 1
+			return None
+
+		# Mark as recently used (for eviction)
+		try:
+			os.utime(path,None)
+		except OSError:
+			pass
+
+		self.hits += 1
+		return parsedSentences
+
+	def put(self,text,modelName,parsedSentences):
+		"""
+		Add the parse of a text to the cache
+
+		:param text: Text that was parsed
+		:param modelName: Name (and version) of the model used for parsing
+		:param parsedSentences: The parsed sentences to store
+		:type text: str
+		:type modelName: str
+		:type parsedSentences: list
+		"""
+
+		path = self._getPath(text,modelName)
+		entryDir = os.path.dirname(path)
+		if not os.path.isdir(entryDir):
+			try:
+				os.makedirs(entryDir)
+			except OSError:
+				# Another process may have just created it
+				if not os.path.isdir(entryDir):
+					raise
+
+		# Write to a temporary file and then rename it so that other processes never see a partial entry
+		fd,tempPath = tempfile.mkstemp(dir=entryDir,suffix='.tmp')
+		with os.fdopen(fd,'wb') as f:
+			pickle.dump(parsedSentences,f,protocol=2)
+
+		# If the text is already cached, its old entry is replaced so its size shouldn't be counted twice
+		oldSize = os.path.getsize(path) if os.path.isfile(path) else 0
+		os.rename(tempPath,path)
+
+		self.currentSize += os.path.getsize(path) - oldSize
+		if self.currentSize > self.maxSize:
+			self._evict()
+
+	def _evict(self):
+		# Remove the least recently used entries. We go a little below the maximum size so that we don't need to rescan the cache for every new entry
+		entries = sorted(self._listEntries())
+		self.currentSize = sum( size for _,size,_ in entries )
+		targetSize = int(0.9 * self.maxSize)
+		for _,size,path in entries:
+			if self.currentSize <= targetSize:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+			self.currentSize -= size
+
+	def clear(self):
+		"""
+		Remove all entries from the cache and reset the hit/miss counters
+		"""
+
+		for _,_,path in self._listEntries():
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+		self.currentSize = 0
+		self.hits = 0
+		self.misses = 0
+
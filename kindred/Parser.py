@@ -2,103 +2,449 @@
 
 
 import kindred
-from intervaltree import IntervalTree
 from collections import defaultdict
+import multiprocessing
+import itertools
+import re
+
+from kindred.SpacyBackend import SpacyBackend
+
+# Parser instance for each worker process (see _initParserWorker)
+_workerParser = None
+
+def _initParserWorker(parser):
+	global _workerParser
+	_workerParser = parser
+
+def _parseShardInWorker(shard):
+	shardIndices,texts,entitySpans,batchSize = shard
+	parsedTexts = list(_workerParser.backend.parseTexts(texts,batchSize,entitySpans))
+	return shardIndices,parsedTexts
+
+def _makeBatches(texts,maxCount,maxCharacters):
+	# Groups the texts into batches of at most maxCount texts with at most maxCharacters in total (if given). A text longer than
+	# maxCharacters gets a batch to itself. Texts are taken longest-first so that a single huge text is started early and so
+	# that the texts in each batch have similar lengths.
+	longestFirst = sorted(range(len(texts)), key=lambda i : len(texts[i]), reverse=True)
+	batches = []
+	batch,batchCharacters = [],0
+	for i in longestFirst:
+		isFull = len(batch) == maxCount or (not maxCharacters is None and batchCharacters + len(texts[i]) > maxCharacters)
+		if len(batch) > 0 and isFull:
+			batches.append(batch)
+			batch,batchCharacters = [],0
+		batch.append(i)
+		batchCharacters += len(texts[i])
+	if len(batch) > 0:
+		batches.append(batch)
+	return batches
+
+_sentenceEndRegex = re.compile(r'[.!?]\s+')
+
+def _splitTextIntoChunks(text,maxChunkLength):
+	# Splits a long text into chunks that are no longer than maxChunkLength. We try to split at a paragraph break,
+	# then the end of a sentence, then a line break (as hard-wrapped text has them in the middle of sentences) and then
+	# any whitespace. Gives back the start offset of each chunk along with its text.
+	chunks = []
+	chunkStart = 0
+	while len(text) - chunkStart > maxChunkLength:
+		window = text[chunkStart:chunkStart+maxChunkLength]
+
+		splitPos = window.rfind('\n\n')
+		if splitPos > 0:
+			splitPos += 2
+
+		if splitPos <= 0:
+			sentenceEnds = [ m.end() for m in _sentenceEndRegex.finditer(window) if m.end() < len(window) ]
+			if len(sentenceEnds) > 0:
+				splitPos = sentenceEnds[-1]
+
+		if splitPos <= 0:
+			splitPos = window.rfind('\n') + 1
+
+		if splitPos <= 0:
+			whitespace = [ m.end() for m in re.finditer(r'\s+',window) if m.end() < len(window) ]
+			if len(whitespace) > 0:
+				splitPos = whitespace[-1]
+
+		if splitPos <= 0:
+			splitPos = maxChunkLength
+
+		chunks.append((chunkStart,window[:splitPos]))
+		chunkStart += splitPos
+
+	if chunkStart == 0:
+		chunks.append((0,text))
+	else:
+		chunks.append((chunkStart,text[chunkStart:]))
+
+	return chunks
+
+def _alignEntitiesToTokens(entities,tokenPositions):
+	# Finds the entity IDs that overlap each token (with an entity appearing once for each of its spans that overlaps).
+	# The entity spans and tokens are sorted by position and matched in a single sweep, so this is linear in the number
+	# of tokens and spans (apart from the sorting, and tokens will normally already be in order).
+
+	# Each distinct (non-empty) span of each entity
+	spans = sorted(set( (a,b,e.entityID) for e in entities for a,b in e.position if b > a ))
+
+	tokenOrder = sorted(range(len(tokenPositions)), key=lambda i : tokenPositions[i])
+
+	entityIDsForTokens = [ [] for _ in tokenPositions ]
+	activeSpans = []
+	nextSpan = 0
+	for i in tokenOrder:
+		tokenStart,tokenEnd = tokenPositions[i]
+		if tokenEnd <= tokenStart:
+			continue
+
+		# Bring in all the spans that start before the end of this token
+		while nextSpan < len(spans) and spans[nextSpan][0] < tokenEnd:
+			activeSpans.append(spans[nextSpan])
+			nextSpan += 1
+
+		# And drop the spans that finished before this token (as tokens are sorted, they won't overlap later tokens either)
+		activeSpans = [ span for span in activeSpans if span[1] > tokenStart ]
+
+		entityIDsForTokens[i] = [ entityID for a,b,entityID in activeSpans if a < tokenEnd ]
+
+	return entityIDsForTokens
+
+def _addSentencesToDocument(d,parsedSentences,stringTable=None,columnar=False):
+	# Adds the sentences (from a backend or loaded from previously parsed data) to a document, with the entities aligned to the tokens.
+	# Any sentences from a previous parse of this document (if its text has since changed) are cleared out first.
+	# If a string table is given, the words, lemmas, part-of-speech tags and dependency types are interned with it (or the
+	# sentences are stored as ColumnarSentences that use it if columnar is set).
+	assert stringTable is not None or not columnar
+	d.sentences = []
+
+	entityIDsToEntities = d.getEntityIDsToEntities()
+
+	tokenPositions = [ (startPos,endPos) for tokenInfo,_ in parsedSentences for _,_,_,startPos,endPos in tokenInfo ]
+	entityIDsForTokens = _alignEntitiesToTokens(d.getEntities(),tokenPositions)
+
+	tokenIndexOffset = 0
+	for tokenInfo,dependencies in parsedSentences:
+		# A backend may give back empty sentences (e.g. for blank text) which are skipped
+		if len(tokenInfo) == 0:
+			continue
+
+		# The sentences refer to the document's text (instead of each holding a copy of their part of it)
+		textOffsets = (tokenInfo[0][3],tokenInfo[-1][4])
+
+		# TODO: Should I filter this more or just leave it for simplicity
+
+		entityIDsToTokenLocs = defaultdict(list)
+		for i in range(len(tokenInfo)):
+			for entityID in entityIDsForTokens[tokenIndexOffset+i]:
+				entityIDsToTokenLocs[entityID].append(i)
+		tokenIndexOffset += len(tokenInfo)
+
+		# Let's gather up the information about the "known" entities in the sentence
+		entitiesWithLocations = []
+		for entityID,entityLocs in sorted(entityIDsToTokenLocs.items()):
+			e = entityIDsToEntities[entityID]
+			entityWithLocation = (e, entityLocs)
+			entitiesWithLocations.append(entityWithLocation)
+
+		if not columnar:
+			if not stringTable is None:
+				intern = stringTable.intern
+				tokenInfo = [ (intern(word),intern(lemma),intern(partofspeech),startPos,endPos) for word,lemma,partofspeech,startPos,endPos in tokenInfo ]
+				dependencies = [ (a,b,intern(dependencyType)) for a,b,dependencyType in dependencies ]
+			tokens = [ kindred.Token(word,lemma,partofspeech,startPos,endPos) for word,lemma,partofspeech,startPos,endPos in tokenInfo ]
+			sentence = kindred.Sentence._createTrusted(d.text, tokens, dependencies, entitiesWithLocations, d.getSourceFilename(), textOffsets)
+		else:
+			sentence = kindred.ColumnarSentence._createTrusted(d.text, tokenInfo, dependencies, entitiesWithLocations, stringTable, d.getSourceFilename(), textOffsets)
+		d.addSentence(sentence)
+
+	d.parsedText = d.text
 
 class Parser:
 	"""
-	Runs Spacy on corpus to get sentences and associated tokens
+	Runs Spacy (or another backend) on corpus to get sentences and associated tokens
 	"""
+
+	acceptedLanguages = SpacyBackend.acceptedLanguages
 	
-	def __init__(self,language='en'):
+	def __init__(self,language='en',cache=None,features=None,maxChunkLength=None,parseEntitySentencesOnly=False,backend='spacy',limits=None,columnarSentences=False):
 		"""
-		Create a Parser object that will use Spacy for parsing. It uses Spacy and offers all the same languages that Spacy offers. Check out: https://spacy.io/usage/models. Note that the language model needs to be downloaded first (e.g. python -m spacy download en)
+		Create a Parser object that will use Spacy for parsing by default. It uses Spacy and offers all the same languages that Spacy offers. Check out: https://spacy.io/usage/models. Note that the language model needs to be downloaded first (e.g. python -m spacy download en). The model is loaded the first time it is needed and is then shared by all Parsers in the process. Alternatively, a simple rule-based backend can be used which needs no models but only splits sentences and tokens.
 		
 		:param language: Language to parse (en/de/es/pt/fr/it/nl)
+		:param cache: Optional on-disk cache of previous parses. Text found in the cache will not be parsed again
+		:param features: The features (see kindred.Vectorizer) that will be calculated with the parsed corpus. Only the Spacy components needed for these features are run. If no dependency-based features are needed, the sentences are split using fast rules instead of the dependency parser. None will run all the components. None of the features use lemmas or part-of-speech tags, so if any features are given, the tagger is not run and the tokens have empty lemmas and part-of-speech tags
+		:param maxChunkLength: Documents longer than this (in characters) are split into chunks (at paragraph or sentence breaks where possible) that are parsed separately. None will use the maximum length allowed by the backend (e.g. the Spacy model)
+		:param parseEntitySentencesOnly: Whether to split sentences using fast rules first and then only tag and dependency parse the sentences that contain at least two entities (as only these can give candidate relations). The other sentences will only have tokens (with no lemmas, part-of-speech tags or dependencies)
+		:param backend: The backend to use for parsing: 'spacy', 'simple' (rule-based sentence splitting and tokenization with no models or dependency parsing, which can be used when the features don't need dependencies) or a kindred.ParserBackend object
+		:param limits: Optional limits on the size of documents. Documents that are too long are quarantined instead of being parsed, as are documents with sentences that have too many tokens or entities once parsed
+		:param columnarSentences: Whether to store the sentences as kindred.ColumnarSentence objects (which keep tokens and dependencies in compact arrays, with strings in a table shared by the corpus) to save memory on large corpora
 		:type language: str
+		:type cache: kindred.ParseCache
+		:type features: list of str
+		:type maxChunkLength: int
+		:type parseEntitySentencesOnly: bool
+		:type backend: str or kindred.ParserBackend
+		:type limits: kindred.ProcessingLimits
+		:type columnarSentences: bool
 		"""
 
-		# We only load spacy if a Parser is created (to allow ReadTheDocs to build the documentation easily)
-		import spacy
-
-		acceptedLanguages = ['en','de','es','pt','fr','it','nl']
-		assert language in acceptedLanguages, "Language for parser (%s) not in accepted languages: %s" % (language,str(acceptedLanguages))
+		assert language in Parser.acceptedLanguages, "Language for parser (%s) not in accepted languages: %s" % (language,str(Parser.acceptedLanguages))
+		assert cache is None or isinstance(cache,kindred.ParseCache)
+		assert maxChunkLength is None or (isinstance(maxChunkLength,int) and maxChunkLength > 0), "maxChunkLength must be None or a positive integer"
+		assert isinstance(parseEntitySentencesOnly,bool)
+		assert limits is None or isinstance(limits,kindred.ProcessingLimits)
+		assert backend in ['spacy','simple'] or isinstance(backend,kindred.ParserBackend), "backend must be 'spacy', 'simple' or a kindred.ParserBackend"
 
 		self.language = language
+		self.cache = cache
+		self.maxChunkLength = maxChunkLength
+		self.parseEntitySentencesOnly = parseEntitySentencesOnly
+		self.limits = limits
+		self.columnarSentences = columnarSentences
+
+		# Used by the ColumnarSentences of documents that aren't in a corpus (see parseIter). These need a table that lasts as long as
+		# the sentences, but normal sentences only intern their strings with a table for each group of documents (so that the strings
+		# of every document parsed aren't kept)
+		self.stringTable = kindred.StringTable() if columnarSentences else None
 
-		self.nlp = spacy.load(language, disable=['ner'])
+		if features is None:
+			self.needsTagging = True
+			self.needsDependencies = True
+		else:
+			featureInfo = kindred.Vectorizer.featureInfo
+			for f in features:
+				assert f in featureInfo, "Feature (%s) is not a valid feature" % f
+			self.needsTagging = False
+			self.needsDependencies = any( featureInfo[f].get('needsDependencies',True) for f in features )
 
-	def _sentencesGenerator(self,text):
-		parsed = self.nlp(text)
-		sentence = None
-		for token in parsed:
-			if sentence is None or token.is_sent_start:
-				if not sentence is None:
-					yield sentence
-				sentence = []
-			sentence.append(token)
+		if backend == 'spacy':
+			self.backend = kindred.SpacyBackend(language,tagging=self.needsTagging,dependencies=self.needsDependencies,entitySentencesOnly=parseEntitySentencesOnly)
+		elif backend == 'simple':
+			self.backend = kindred.SimpleBackend()
+		else:
+			self.backend = backend
 
-		if not sentence is None and len(sentence) > 0:
-			yield sentence
+		if not features is None and self.needsDependencies:
+			assert self.backend.providesDependencies, "The chosen features need dependency parses which the %s backend does not provide" % self.backend.getName()
+		assert not parseEntitySentencesOnly or isinstance(self.backend,kindred.SpacyBackend), "parseEntitySentencesOnly can only be used with the spacy backend"
 
-	def parse(self,corpus):
+	@property
+	def nlp(self):
 		"""
-		Parse the corpus. Each document will be split into sentences which are then tokenized and parsed for their dependency graph. All parsed information is stored within the corpus object.
-		
+		The (shared) Spacy model used by this Parser (when using the spacy backend)
+		"""
+		return self.backend.nlp
+
+	def _getModelName(self,maxBatchCharacters=None):
+		# Used to identify parses from this backend in the cache
+		return "%s chunks=%s" % (self.backend.getName(),str(self._getMaxChunkLength(maxBatchCharacters)))
+
+	def _getCacheModelName(self,d,modelName):
+		# When only sentences with entities are parsed, the parse also depends on where the entities are
+		if self.parseEntitySentencesOnly:
+			return "%s entities=%s" % (modelName,str(sorted( sorted(e.position) for e in d.entities )))
+		return modelName
+
+	def _getMaxChunkLength(self,maxBatchCharacters=None):
+		maxChunkLength = self.maxChunkLength
+		if maxChunkLength is None:
+			maxChunkLength = self.backend.getMaxLength()
+
+		# No chunk can be bigger than a batch
+		if not maxBatchCharacters is None and (maxChunkLength is None or maxBatchCharacters < maxChunkLength):
+			maxChunkLength = maxBatchCharacters
+
+		return maxChunkLength
+
+	def _addParsedSentences(self,d,parsedSentences,stringTable):
+		_addSentencesToDocument(d,parsedSentences,stringTable,self.columnarSentences)
+		if not self.limits is None:
+			reason = self.limits.checkSentences(d)
+			if not reason is None:
+				d.quarantine(reason)
+
+	def _parseTextsInBatches(self,texts,batchSize,maxBatchCharacters,entitySpans):
+		# Parses the texts a batch at a time so that the backend never holds more than maxBatchCharacters of text (and its parse) at once
+		for batchIndices in _makeBatches(texts,batchSize,maxBatchCharacters):
+			batchEntitySpans = None if entitySpans is None else [ entitySpans[i] for i in batchIndices ]
+			parsedTexts = self.backend.parseTexts([ texts[i] for i in batchIndices ],batchSize,batchEntitySpans)
+			for i,parsedSentences in zip(batchIndices,parsedTexts):
+				yield i,parsedSentences
+
+	def _createWorkerPool(self,nWorkers):
+		# Each worker needs the backend's model once. Loading it here first means that forked workers share the memory for it
+		self.backend.load()
+		return multiprocessing.Pool(nWorkers, initializer=_initParserWorker, initargs=(self,))
+
+	def _parseTextsWithWorkers(self,texts,batchSize,maxBatchCharacters,nWorkers,entitySpans,pool):
+		# Shard the texts longest-first so that a single huge text is started early and doesn't hold up the end of the run.
+		# Shards are kept small enough that each worker gets several of them to balance the load.
+		shardSize = max(1,min(batchSize,len(texts) // (4*nWorkers)))
+		shards = []
+		for shardIndices in _makeBatches(texts,shardSize,maxBatchCharacters):
+			shardEntitySpans = None if entitySpans is None else [ entitySpans[i] for i in shardIndices ]
+			shards.append((shardIndices,[ texts[i] for i in shardIndices ],shardEntitySpans,batchSize))
+
+		# Use the given pool (which is kept between calls by parseIter) or start one just for these texts
+		ownPool = pool is None
+		if ownPool:
+			pool = self._createWorkerPool(nWorkers)
+		try:
+			for shardIndices,parsedTexts in pool.imap_unordered(_parseShardInWorker, shards):
+				for i,parsedSentences in zip(shardIndices,parsedTexts):
+					yield i,parsedSentences
+		finally:
+			if ownPool:
+				pool.close()
+				pool.join()
+
+	def _parseDocuments(self,documents,batchSize,maxBatchCharacters,nWorkers,pool):
+		# Gives back each document with its parsed sentences (in no particular order when using workers or batching by characters)
+
+		# Long documents are split up into chunks that are parsed separately
+		maxChunkLength = self._getMaxChunkLength(maxBatchCharacters)
+		chunkTexts,chunkLocations = [],[]
+		chunkCounts = []
+		chunkEntitySpans = [] if self.parseEntitySentencesOnly else None
+		for docIndex,d in enumerate(documents):
+			if maxChunkLength is None:
+				chunks = [(0,d.text)]
+			else:
+				chunks = _splitTextIntoChunks(d.text,maxChunkLength)
+			for indexInDoc,(chunkStart,chunkText) in enumerate(chunks):
+				chunkTexts.append(chunkText)
+				chunkLocations.append((docIndex,indexInDoc,chunkStart))
+				if self.parseEntitySentencesOnly:
+					chunkEnd = chunkStart + len(chunkText)
+					chunkEntitySpans.append([ (startPos-chunkStart,endPos-chunkStart,entityIndex) for entityIndex,e in enumerate(d.entities) for startPos,endPos in e.position if startPos < chunkEnd and endPos > chunkStart ])
+			chunkCounts.append(len(chunks))
+
+		# Nothing to parse (e.g. all the documents were in the cache) so the backend doesn't need to load its model
+		if len(chunkTexts) == 0:
+			return
+
+		if nWorkers > 1 and len(chunkTexts) > 1:
+			parsedChunks = self._parseTextsWithWorkers(chunkTexts,batchSize,maxBatchCharacters,nWorkers,chunkEntitySpans,pool)
+		elif not maxBatchCharacters is None:
+			parsedChunks = self._parseTextsInBatches(chunkTexts,batchSize,maxBatchCharacters,chunkEntitySpans)
+		else:
+			parsedChunks = enumerate(self.backend.parseTexts(chunkTexts,batchSize,chunkEntitySpans))
+
+		# Put the chunks back together (with token positions moved back into document coordinates)
+		chunksForDocuments = {}
+		for chunkIndex,parsedSentences in parsedChunks:
+			docIndex,indexInDoc,chunkStart = chunkLocations[chunkIndex]
+			if chunkCounts[docIndex] == 1:
+				yield documents[docIndex],parsedSentences
+				continue
+
+			parsedSentences = [ ([ (word,lemma,partofspeech,startPos+chunkStart,endPos+chunkStart) for word,lemma,partofspeech,startPos,endPos in tokens ],dependencies) for tokens,dependencies in parsedSentences ]
+
+			if not docIndex in chunksForDocuments:
+				chunksForDocuments[docIndex] = {}
+			chunksForDocuments[docIndex][indexInDoc] = parsedSentences
+
+			if len(chunksForDocuments[docIndex]) == chunkCounts[docIndex]:
+				parsedChunksForDoc = chunksForDocuments.pop(docIndex)
+				sentences = [ sentence for i in range(chunkCounts[docIndex]) for sentence in parsedChunksForDoc[i] ]
+				yield documents[docIndex],sentences
+
+	def _parseDocumentList(self,documents,batchSize,nWorkers,maxBatchCharacters,pool,stringTable):
+		if not self.cache is None:
+			modelName = self._getModelName(maxBatchCharacters)
+
+		# Only parse the documents that haven't been parsed before (or whose text has changed)
+		documentsToParse = []
+		for d in documents:
+			if d.isParsed() or not d.quarantineReason is None:
+				continue
+
+			if not self.limits is None:
+				reason = self.limits.checkText(d)
+				if not reason is None:
+					d.quarantine(reason)
+					continue
+
+			parsedSentences = None
+			if not self.cache is None:
+				parsedSentences = self.cache.get(d.text,self._getCacheModelName(d,modelName))
+
+			if parsedSentences is None:
+				documentsToParse.append(d)
+			else:
+				self._addParsedSentences(d,parsedSentences,stringTable)
+
+		for d,parsedSentences in self._parseDocuments(documentsToParse,batchSize,maxBatchCharacters,nWorkers,pool):
+			if not self.cache is None:
+				self.cache.put(d.text,self._getCacheModelName(d,modelName),parsedSentences)
+			self._addParsedSentences(d,parsedSentences,stringTable)
+
+	def parse(self,corpus,batchSize=100,nWorkers=1,maxBatchCharacters=None):
+		"""
+		Parse the corpus. Each document will be split into sentences which are then tokenized and parsed for their dependency graph. All parsed information is stored within the corpus object. Only documents that haven't already been parsed (or whose text has changed since they were parsed) and haven't been quarantined are parsed. Documents are streamed through Spacy in batches which is much faster than parsing them one at a time. Parsing can also be spread across multiple processes (each of which loads its own copy of the Spacy model).
+
 		:param corpus: Corpus to parse
+		:param batchSize: Number of documents that Spacy should process in each batch (and the number of documents sent to a worker process at a time)
+		:param nWorkers: Number of worker processes to use for parsing. 1 will parse in the current process
+		:param maxBatchCharacters: Maximum total length (in characters) of the documents in each batch. This limits the memory used for parsing (in each process) no matter how long the documents are, as longer documents are split into chunks of at most this length. None will only limit batches by the number of documents
 		:type corpus: kindred.Corpus
+		:type batchSize: int
+		:type nWorkers: int
+		:type maxBatchCharacters: int
 		"""
 
 		assert isinstance(corpus,kindred.Corpus)
+		assert isinstance(batchSize,int) and batchSize > 0, "batchSize must be a positive integer"
+		assert isinstance(nWorkers,int) and nWorkers > 0, "nWorkers must be a positive integer"
+		assert maxBatchCharacters is None or (isinstance(maxBatchCharacters,int) and maxBatchCharacters > 0), "maxBatchCharacters must be None or a positive integer"
 
-		for d in corpus.documents:
-		#for doctokens in self.nlp.pipe( d.text for d in corpus.documents, batch_size=2, n_threads=1):
-			entityIDsToEntities = d.getEntityIDsToEntities()
-		
-			denotationTree = IntervalTree()
-			entityTypeLookup = {}
-			for e in d.getEntities():
-				entityTypeLookup[e.entityID] = e.entityType
-			
-				for a,b in e.position:
-					if b > a:
-						denotationTree[a:b] = e.entityID
-				
-			for sentence in self._sentencesGenerator(d.text):
-				tokens = []
-				for t in sentence:
-					token = kindred.Token(t.text,t.lemma_,t.pos_,t.idx,t.idx+len(t.text))
-					tokens.append(token)
-
-				sentenceStart = tokens[0].startPos
-				sentenceEnd = tokens[-1].endPos
-				sentenceTxt = d.text[sentenceStart:sentenceEnd]
-
-				indexOffset = sentence[0].i
-				dependencies = []
-				for t in sentence:
-					depName = t.dep_
-					dep = (t.head.i-indexOffset,t.i-indexOffset,depName)
-					dependencies.append(dep)
-
-				# TODO: Should I filter this more or just leave it for simplicity
-					
-				entityIDsToTokenLocs = defaultdict(list)
-				for i,t in enumerate(tokens):
-					entitiesOverlappingWithToken = denotationTree[t.startPos:t.endPos]
-					for interval in entitiesOverlappingWithToken:
-						entityID = interval.data
-						entityIDsToTokenLocs[entityID].append(i)
-
-				# Let's gather up the information about the "known" entities in the sentence
-				entitiesWithLocations = []
-				for entityID,entityLocs in sorted(entityIDsToTokenLocs.items()):
-					e = entityIDsToEntities[entityID]
-					entityWithLocation = (e, entityLocs)
-					entitiesWithLocations.append(entityWithLocation)
-					
-				sentence = kindred.Sentence(sentenceTxt, tokens, dependencies, entitiesWithLocations, d.getSourceFilename())
-				d.addSentence(sentence)
-
-		corpus.parsed = True
+		# The strings of the sentences are interned with the corpus's string table (which columnar sentences share)
+		self._parseDocumentList(corpus.documents,batchSize,nWorkers,maxBatchCharacters,None,corpus._getStringTable())
+
+	def parseIter(self,documents,batchSize=100,nWorkers=1,maxBatchCharacters=None,lookahead=None):
+		"""
+		Parse documents from any iterable (e.g. a generator that loads them from a large file) and give them back one at a time (in the same order) once they are parsed. Only a limited number of documents are read ahead and held at a time, so a whole collection can be processed without keeping it all in memory. This otherwise works the same as parse. To parse the documents from iterLoadDataFromBioc, use (doc for corpus in kindred.iterLoadDataFromBioc(filename) for doc in corpus.documents).
+
+		:param documents: Documents to parse
+		:param batchSize: Number of documents that Spacy should process in each batch (and the number of documents sent to a worker process at a time)
+		:param nWorkers: Number of worker processes to use for parsing. 1 will parse in the current process. The worker processes are kept until all the documents have been parsed
+		:param maxBatchCharacters: Maximum total length (in characters) of the documents in each batch. None will only limit batches by the number of documents
+		:param lookahead: Maximum number of documents to read from the iterable before giving them back. None will use batchSize*nWorkers
+		:type documents: iterable of kindred.Document
+		:type batchSize: int
+		:type nWorkers: int
+		:type maxBatchCharacters: int
+		:type lookahead: int
+		:return: The parsed documents
+		:rtype: generator of kindred.Document
+		"""
+
+		assert isinstance(batchSize,int) and batchSize > 0, "batchSize must be a positive integer"
+		assert isinstance(nWorkers,int) and nWorkers > 0, "nWorkers must be a positive integer"
+		assert maxBatchCharacters is None or (isinstance(maxBatchCharacters,int) and maxBatchCharacters > 0), "maxBatchCharacters must be None or a positive integer"
+		assert lookahead is None or (isinstance(lookahead,int) and lookahead > 0), "lookahead must be None or a positive integer"
+
+		if lookahead is None:
+			lookahead = batchSize*nWorkers
+
+		pool = self._createWorkerPool(nWorkers) if nWorkers > 1 else None
+		try:
+			documentIterator = iter(documents)
+			while True:
+				group = list(itertools.islice(documentIterator,lookahead))
+				if len(group) == 0:
+					break
+
+				for d in group:
+					assert isinstance(d,kindred.Document)
+
+				stringTable = self.stringTable if self.columnarSentences else kindred.StringTable()
+				self._parseDocumentList(group,batchSize,nWorkers,maxBatchCharacters,pool,stringTable)
+				for d in group:
+					yield d
+		finally:
+			if not pool is None:
+				pool.close()
+				pool.join()
 
@@ -0,0 +1,44 @@
+class ParserBackend:
+	"""
+	Base class for the tools that a Parser can use to split text into sentences and tokens (and optionally get lemmas, part-of-speech tags and dependency parses). A new backend should override parseTexts (and the others where needed) and can then be given to a Parser. It should also set providesDependencies to True if it gives a dependency parse for each sentence.
+	"""
+
+	providesDependencies = False
+
+	def getName(self):
+		"""
+		Get a name that identifies the backend and its settings (including the version of any model used). This is used to identify parses from this backend in a ParseCache. By default, this is the name of the class.
+
+		:return: Name of the backend
+		:rtype: str
+		"""
+		return self.__class__.__name__
+
+	def getMaxLength(self):
+		"""
+		Get the longest text (in characters) that the backend can parse in one go. Longer documents are split into chunks by the Parser.
+
+		:return: Maximum length of text or None if there is no limit
+		:rtype: int
+		"""
+		return None
+
+	def load(self):
+		"""
+		Load anything (e.g. models) that the backend needs before parsing. This is called before starting worker processes so that they can share it. By default, this does nothing.
+		"""
+		pass
+
+	def parseTexts(self,texts,batchSize,entitySpans=None):
+		"""
+		Parse a set of texts and give back (as a generator) a list of the sentences found in each one, in the same order as the texts. Each sentence is a tuple of the tokens (a list of (word,lemma,partofspeech,startPos,endPos) tuples) and the dependencies (a list of (headIndex,tokenIndex,dependencyType) tuples with indices within the sentence). Empty strings can be used for lemmas and part-of-speech tags and an empty list for dependencies if they are not available. Sentences without any tokens are skipped. All of these should be basic Python types so that they can be cached and passed between processes.
+
+		:param texts: Texts to parse
+		:param batchSize: Suggested number of texts to process at one time
+		:param entitySpans: Optional list of entity locations for each text as (startPos,endPos,entityIndex) tuples. Backends are free to ignore these
+		:type texts: list of str
+		:type batchSize: int
+		:type entitySpans: list of lists of tuples
+		"""
+		raise NotImplementedError()
+
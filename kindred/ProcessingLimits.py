@@ -0,0 +1,79 @@
+import time
+
+class ProcessingLimitExceeded(RuntimeError):
+	"""
+	Raised when processing goes over one of the limits in a ProcessingLimits (e.g. runs out of time)
+	"""
+	pass
+
+class ProcessingLimits:
+	"""
+	Limits on the size of each document (and the time spent on it) that can be given to a Parser or CandidateBuilder. A document that goes over a limit is quarantined (see Document.quarantine) with the reason instead of holding up the rest of the corpus. Quarantined documents have no sentences and are skipped by later steps. Each limit can be None to not use it.
+	"""
+
+	def __init__(self,maxCharacters=None,maxSentenceTokens=None,maxSentenceEntities=None,maxSeconds=None):
+		"""
+		Create a set of limits for processing documents
+
+		:param maxCharacters: Maximum length of a document (in characters). This is checked before parsing
+		:param maxSentenceTokens: Maximum number of tokens in any sentence of a document
+		:param maxSentenceEntities: Maximum number of entities in any sentence of a document
+		:param maxSeconds: Maximum time (in seconds) to spend on each document when building candidates (with a CandidateBuilder) and when finding dependency paths (with a Vectorizer)
+		:type maxCharacters: int
+		:type maxSentenceTokens: int
+		:type maxSentenceEntities: int
+		:type maxSeconds: float
+		"""
+
+		for name,limit in [('maxCharacters',maxCharacters),('maxSentenceTokens',maxSentenceTokens),('maxSentenceEntities',maxSentenceEntities)]:
+			assert limit is None or (isinstance(limit,int) and limit > 0), "%s must be None or a positive integer" % name
+		assert maxSeconds is None or (isinstance(maxSeconds,(int,float)) and maxSeconds > 0), "maxSeconds must be None or a positive number"
+
+		self.maxCharacters = maxCharacters
+		self.maxSentenceTokens = maxSentenceTokens
+		self.maxSentenceEntities = maxSentenceEntities
+		self.maxSeconds = maxSeconds
+
+	def checkText(self,document):
+		"""
+		Check whether the text of a document is too long
+
+		:param document: Document to check
+		:type document: kindred.Document
+		:return: The reason that the document is over the limit or None if it isn't
+		:rtype: str
+		"""
+
+		if not self.maxCharacters is None and len(document.text) > self.maxCharacters:
+			return "Document has %d characters (limit is %d)" % (len(document.text),self.maxCharacters)
+		return None
+
+	def checkSentences(self,document):
+		"""
+		Check whether any of the (parsed) sentences of a document have too many tokens or entities
+
+		:param document: Document to check
+		:type document: kindred.Document
+		:return: The reason that the document is over a limit or None if it isn't
+		:rtype: str
+		"""
+
+		for i,sentence in enumerate(document.sentences):
+			if not self.maxSentenceTokens is None and len(sentence.tokens) > self.maxSentenceTokens:
+				return "Sentence %d has %d tokens (limit is %d)" % (i,len(sentence.tokens),self.maxSentenceTokens)
+			if not self.maxSentenceEntities is None and len(sentence.entitiesWithLocations) > self.maxSentenceEntities:
+				return "Sentence %d has %d entities (limit is %d)" % (i,len(sentence.entitiesWithLocations),self.maxSentenceEntities)
+		return None
+
+	def getDeadline(self):
+		"""
+		Get the time (as given by time.time()) that work on a document starting now must be finished by
+
+		:return: The deadline or None if there is no time limit
+		:rtype: float
+		"""
+
+		if self.maxSeconds is None:
+			return None
+		return time.time() + self.maxSeconds
+
@@ -1,8 +1,10 @@
 
-class Relation:
+class Relation(object):
 	"""
 	Describes relationship between entities (including relation type and argument names if applicable).
 	"""
+
+	__slots__ = ['relationType','entityIDs','argNames']
 	
 	def __init__(self,relationType=None,entityIDs=[],argNames=None):
 		"""
@@ -17,19 +19,29 @@ class Relation:
 		"""
 
 		assert isinstance(entityIDs,list)
+		if not argNames is None:
+			assert len(argNames) == len(entityIDs)
+			argNames = [ str(a) for a in argNames ]
+
+		self._setAttributes(relationType,entityIDs,argNames)
+
+	@classmethod
+	def _createTrusted(cls,*args,**kwargs):
+		# Creates a relation (with the same arguments as the constructor) without checking them, for use by kindred's own
+		# loaders and CandidateBuilder. The argument names must already be strings
+		relation = cls.__new__(cls)
+		relation._setAttributes(*args,**kwargs)
+		return relation
 
+	def _setAttributes(self,relationType=None,entityIDs=[],argNames=None):
 		self.relationType = relationType
 		self.entityIDs = entityIDs
-		if argNames == None:
-			self.argNames = None
-		else:
-			assert len(argNames) == len(entityIDs)
-			self.argNames = [ str(a) for a in argNames ]
+		self.argNames = argNames
 	
 	def __eq__(self, other):
 		"""Override the default Equals behavior"""
 		if isinstance(other, self.__class__):
-			return self.__dict__ == other.__dict__
+			return (self.relationType,self.entityIDs,self.argNames) == (other.relationType,other.entityIDs,other.argNames)
 		return False
 	
 	def __ne__(self, other):
@@ -47,3 +59,10 @@ class Relation:
 			return hash((self.relationType,tuple(self.entityIDs)))
 		else:
 			return hash((self.relationType,tuple(self.entityIDs),tuple(self.argNames)))
+
+	def __getstate__(self):
+		return { name:getattr(self,name) for name in Relation.__slots__ }
+
+	def __setstate__(self, state):
+		for name,value in state.items():
+			setattr(self,name,value)
@@ -2,6 +2,7 @@
 from sklearn import svm
 from sklearn.linear_model import LogisticRegression
 from collections import defaultdict
+import numpy
 
 import kindred
 from kindred.CandidateBuilder import CandidateBuilder
@@ -11,7 +12,15 @@ class RelationClassifier:
 	"""
 	Manages binary classifier(s) for relation classification.
 	"""
-	def __init__(self,classifierType='SVM',tfidf=True,features=None,threshold=None,acceptedEntityPairs=None):
+
+	# Defaults for classifiers pickled before these options were added
+	limits = None
+	negativeFraction = None
+	negativeRatio = None
+	stratifyNegatives = False
+	randomSeed = 1
+
+	def __init__(self,classifierType='SVM',tfidf=True,features=None,threshold=None,acceptedEntityPairs=None,negativeFraction=None,negativeRatio=None,stratifyNegatives=False,randomSeed=1,limits=None):
 		"""
 		Constructor for the RelationClassifier class
 		
@@ -20,11 +29,21 @@ class RelationClassifier:
 		:param features: A list of specific features. Valid features are "entityTypes","unigramsBetweenEntities","bigrams","dependencyPathEdges","dependencyPathEdgesNearEntities"
 		:param threshold: A specific threshold to use for classification (which will then use a logistic regression classifier)
 		:param acceptedEntityPairs: Pairs of entities that relations must match. None will match allow relations of any entity types.
+		:param negativeFraction: Fraction of the negative candidate relations to randomly keep for training (which makes training faster and use less memory). The kept ones are weighted to stand in for the others. None will use them all
+		:param negativeRatio: Alternative to negativeFraction that keeps (at most) this many negative candidate relations for each positive one (or all of them if there are no positives)
+		:param stratifyNegatives: Whether to sample the negative candidate relations separately for each combination of entity types
+		:param randomSeed: Seed for the random sampling of negative candidate relations
+		:param limits: Optional limits on the size of documents and the time spent on each (when parsing, building candidates and finding dependency paths). Documents that go over a limit are quarantined and left out of training and predictions
 		:type classifierType: str
 		:type tfidf: bool
 		:type features: list of str
 		:type threshold: float
 		:type acceptedEntityPairs: list of tuples
+		:type negativeFraction: float
+		:type negativeRatio: float
+		:type stratifyNegatives: bool
+		:type randomSeed: int
+		:type limits: kindred.ProcessingLimits
 		"""
 		assert classifierType in ['SVM','LogisticRegression'], "classifierType must be 'SVM' or 'LogisticRegression'"
 		assert classifierType == 'LogisticRegression' or threshold is None, "Threshold can only be used when classifierType is 'LogisticRegression'"
@@ -33,6 +52,11 @@ class RelationClassifier:
 		self.classifierType = classifierType
 		self.tfidf = tfidf
 		self.acceptedEntityPairs = acceptedEntityPairs
+		self.negativeFraction = negativeFraction
+		self.negativeRatio = negativeRatio
+		self.stratifyNegatives = stratifyNegatives
+		self.randomSeed = randomSeed
+		self.limits = limits
 
 		self.chosenFeatures = ["entityTypes","unigramsBetweenEntities","bigrams","dependencyPathEdges","dependencyPathEdgesNearEntities"]
 		if not features is None:
@@ -49,14 +73,18 @@ class RelationClassifier:
 		:type corpus: kindred.Corpus
 		"""
 		assert isinstance(corpus,kindred.Corpus)
+
+		# Only run the parsing needed for the chosen features
+		if not corpus.parsed:
+			parser = kindred.Parser(features=self.chosenFeatures,limits=self.limits)
+			parser.parse(corpus)
 			
-		self.candidateBuilder = CandidateBuilder(acceptedEntityPairs=self.acceptedEntityPairs)
+		self.candidateBuilder = CandidateBuilder(acceptedEntityPairs=self.acceptedEntityPairs,negativeFraction=self.negativeFraction,negativeRatio=self.negativeRatio,stratifyNegatives=self.stratifyNegatives,randomSeed=self.randomSeed,limits=self.limits)
 		self.candidateBuilder.fit_transform(corpus)
 		
-		candidateRelations = corpus.getCandidateRelations()
-		candidateClasses = corpus.getCandidateClasses()
+		candidateSet = corpus.getCandidateSet()
 		
-		if len(candidateRelations) == 0:
+		if len(candidateSet) == 0:
 			raise RuntimeError("No candidate relations found in corpus for training")
 
 		self.relTypeToValidEntityTypes = defaultdict(set)
@@ -78,25 +106,42 @@ class RelationClassifier:
 		allClasses = list(range(1,relationtypeCount+1))
 		self.allClasses = allClasses
 	
-		simplifiedClasses = []
-		# TODO: Try sparse matrix rep
-		for candidateRelation,candidateClassGroup in zip(candidateRelations,candidateClasses):
-			simplifiedClasses.append(candidateClassGroup[0])
+		simplifiedClasses = candidateSet.getFirstClasses()
 
-		self.vectorizer = Vectorizer(featureChoice=self.chosenFeatures,tfidf=self.tfidf)
+		self.vectorizer = Vectorizer(featureChoice=self.chosenFeatures,tfidf=self.tfidf,limits=self.limits)
 		trainVectors = self.vectorizer.fit_transform(corpus)
 	
-		assert trainVectors.shape[0] == len(candidateClasses)
+		assert trainVectors.shape[0] == len(candidateSet)
+
+		# Leave out the candidates of any documents that ran out of time while being vectorized
+		candidateWeights = candidateSet.weights
+		isQuarantined = numpy.array([ not doc.quarantineReason is None for doc in corpus.documents ], dtype=bool)
+		toKeep = ~isQuarantined[candidateSet.documentIndices]
+		if not toKeep.any():
+			raise RuntimeError("No candidate relations left for training as all the documents with them ran out of time")
+		elif not toKeep.all():
+			trainVectors = trainVectors.tocsr()[toKeep]
+			simplifiedClasses = simplifiedClasses[toKeep]
+			candidateWeights = candidateWeights[toKeep]
+
+		# If negative candidates were sampled, the kept ones are weighted to stand in for the others and the class weights are
+		# balanced using the weighted counts (i.e. the counts before sampling) so that the model matches one trained on all of them
+		classWeight,sampleWeight = 'balanced',None
+		if (candidateWeights != 1.0).any():
+			sampleWeight = candidateWeights
+			classes = numpy.unique(simplifiedClasses)
+			weightedCounts = { c:candidateWeights[simplifiedClasses==c].sum() for c in classes }
+			classWeight = { c:(sampleWeight.sum() / (len(classes) * weightedCounts[c])) for c in classes }
 
 		self.clf = None
 		if self.classifierType == 'SVM':
-			self.clf = svm.LinearSVC(class_weight='balanced',random_state=1)
+			self.clf = svm.LinearSVC(class_weight=classWeight,random_state=1)
 		elif self.classifierType == 'LogisticRegression' and self.threshold is None:
-			self.clf = LogisticRegression(class_weight='balanced',random_state=1)
+			self.clf = LogisticRegression(class_weight=classWeight,random_state=1)
 		elif self.classifierType == 'LogisticRegression' and not self.threshold is None:
-			self.clf = kindred.LogisticRegressionWithThreshold(self.threshold)
+			self.clf = kindred.LogisticRegressionWithThreshold(self.threshold,classWeight=classWeight)
 
-		self.clf.fit(trainVectors,simplifiedClasses)
+		self.clf.fit(trainVectors,simplifiedClasses,sample_weight=sampleWeight)
 		
 		self.isTrained = True
 
@@ -110,13 +155,17 @@ class RelationClassifier:
 		assert self.isTrained, "Classifier must be trained using train() before predictions can be made"
 	
 		assert isinstance(corpus,kindred.Corpus)
+
+		if not corpus.parsed:
+			parser = kindred.Parser(features=self.chosenFeatures,limits=self.limits)
+			parser.parse(corpus)
 			
 		self.candidateBuilder.transform(corpus)
 
-		candidateRelations = corpus.getCandidateRelations()
+		candidateSet = corpus.getCandidateSet()
 
 		# Check if there are any candidate relations to classify in this corpus
-		if len(candidateRelations) == 0:
+		if len(candidateSet) == 0:
 			return
 		
 		entityIDsToType = {}
@@ -128,18 +177,23 @@ class RelationClassifier:
 		tmpMatrix = self.vectorizer.transform(corpus)
 
 		predictedClasses = self.clf.predict(tmpMatrix)
-		for predictedClass,candidateRelation in zip(predictedClasses,candidateRelations):
-			if predictedClass != 0:
-				relKey = self.classToRelType[predictedClass]
-				relType = relKey[0]
-				argNames = relKey[1:]
-				
-				candidateRelationEntityTypes = tuple( [ entityIDsToType[eID] for eID in candidateRelation.entityIDs ] )
-				if not tuple(candidateRelationEntityTypes) in self.relTypeToValidEntityTypes[relKey]:
-					continue
 
-				predictedRelation = kindred.Relation(relType,candidateRelation.entityIDs,argNames=argNames)
-				predictedRelations.append(predictedRelation)
+		# Only the candidates predicted to be relations (in documents that didn't run out of time while being vectorized) are looked at
+		isQuarantined = numpy.array([ not doc.quarantineReason is None for doc in corpus.documents ], dtype=bool)
+		toCheck = (predictedClasses != 0) & ~isQuarantined[candidateSet.documentIndices]
+		for candidateIndex in numpy.flatnonzero(toCheck).tolist():
+			predictedClass = predictedClasses[candidateIndex]
+			relKey = self.classToRelType[predictedClass]
+			relType = relKey[0]
+			argNames = relKey[1:]
+			
+			candidateEntityIDs = candidateSet.entityIDs[candidateIndex].tolist()
+			candidateRelationEntityTypes = tuple( [ entityIDsToType[eID] for eID in candidateEntityIDs ] )
+			if not tuple(candidateRelationEntityTypes) in self.relTypeToValidEntityTypes[relKey]:
+				continue
+
+			predictedRelation = kindred.Relation(relType,candidateEntityIDs,argNames=argNames)
+			predictedRelations.append(predictedRelation)
 		
 		# Add the predicted relations into the corpus
 		entitiesToDoc = {}
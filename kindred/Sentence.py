@@ -3,29 +3,33 @@ import networkx as nx
 import itertools
 import sys
 import six
+import time
 
-class Sentence:
+class Sentence(object):
 	"""
 	Set of tokens for a sentence after parsing
 	"""
 	
-	def __init__(self, text, tokens, dependencies, entitiesWithLocations, sourceFilename=None):
+	def __init__(self, text, tokens, dependencies, entitiesWithLocations, sourceFilename=None, textOffsets=None):
 		"""
 		Constructor for Sentence class
 	
-		:param text: Text of the sentence
+		:param text: Text of the sentence (or of the whole document if textOffsets is given)
 		:param tokens: List of tokens in sentence
 		:param dependencies: List of dependencies from dependency path. Should be a list of tuples with form (tokenindex1,tokenindex2,dependency_type)
 		:param entitiesWithLocations: List of entities associated with tokens. Should be a list of tuples with form (kindred.Entity, list of tokenindices)"
 		:param sourceFilename: Filename of the source document
+		:param textOffsets: Optional (startPos,endPos) of the sentence within text. The sentence then keeps a reference to the document text and gets its own text from it when needed, instead of storing a copy
 		:type text: str
 		:type tokens: list of kindred.Token
 		:type dependencies: list of tuples
 		:type entitiesWithLocations: list of tuples
 		:type sourceFilename: str
+		:type textOffsets: tuple
 		"""
 
 		assert isinstance(text, six.string_types)
+		assert textOffsets is None or (isinstance(textOffsets,tuple) and len(textOffsets) == 2 and 0 <= textOffsets[0] <= textOffsets[1] <= len(text)), "textOffsets must be a (startPos,endPos) tuple within the text"
 
 		assert isinstance(tokens, list)
 		for token in tokens:
@@ -53,7 +57,18 @@ class Sentence:
 			assert dependency[0] >= -1 and dependency[0] < len(tokens), dependencyErrorMsg
 			assert dependency[1] >= -1 and dependency[1] < len(tokens), dependencyErrorMsg
 		
-		self.text = text
+		self._setAttributes(text, tokens, dependencies, entitiesWithLocations, sourceFilename, textOffsets)
+
+	@classmethod
+	def _createTrusted(cls, *args, **kwargs):
+		# Creates a sentence (with the same arguments as the constructor) without checking them. This is used
+		# internally (e.g. by the Parser) where the data is already known to be valid, as the checks are slow for large corpora
+		sentence = cls.__new__(cls)
+		sentence._setAttributes(*args, **kwargs)
+		return sentence
+
+	def _setAttributes(self, text, tokens, dependencies, entitiesWithLocations, sourceFilename=None, textOffsets=None):
+		self._setText(text,textOffsets)
 		self.tokens = tokens
 		self.entitiesWithLocations = entitiesWithLocations
 		self.sourceFilename = sourceFilename
@@ -66,6 +81,68 @@ class Sentence:
 		self.candidateRelationsWithClasses = []
 		self.candidateRelationsProcessed = False
 	
+	def __setstate__(self, state):
+		# Sentences pickled before the text was stored as offsets into the document text (and before candidates
+		# could be stored in a CandidateSet) have the old attributes, which are moved to the new ones
+		state = dict(state)
+		if 'text' in state:
+			text = state.pop('text')
+			state['documentText'],state['textStart'],state['textEnd'] = text,0,len(text)
+		if 'candidateRelationsWithClasses' in state:
+			state['_candidateRelationsWithClasses'] = state.pop('candidateRelationsWithClasses')
+			state['candidateSetRange'] = None
+		self.__dict__.update(state)
+
+	def _setText(self,text,textOffsets):
+		if textOffsets is None:
+			textOffsets = (0,len(text))
+		self.documentText = text
+		self.textStart,self.textEnd = textOffsets
+
+	@property
+	def text(self):
+		"""
+		The text of the sentence (taken from the text of the document when needed)
+		"""
+		return self.documentText[self.textStart:self.textEnd]
+
+	@text.setter
+	def text(self,text):
+		assert isinstance(text, six.string_types)
+		self._setText(text,None)
+
+	@property
+	def candidateRelationsWithClasses(self):
+		"""
+		The candidate relations of the sentence, as a list of (kindred.Relation, list of classes) tuples. If these came from a CandidateBuilder, they are stored in a kindred.CandidateSet and created when needed
+		"""
+		if self.candidateSetRange is None:
+			return self._candidateRelationsWithClasses
+		candidateSet,start,end = self.candidateSetRange
+		return [ (candidateSet.getRelation(i),candidateSet.getClassesForCandidate(i)) for i in range(start,end) ]
+
+	@candidateRelationsWithClasses.setter
+	def candidateRelationsWithClasses(self,candidateRelationsWithClasses):
+		self._candidateRelationsWithClasses = candidateRelationsWithClasses
+		self.candidateSetRange = None
+
+	def _setCandidateSetRange(self,candidateSet,start,end):
+		# Used by the CandidateBuilder to give the sentence its candidates (candidateSet[start:end])
+		self._candidateRelationsWithClasses = None
+		self.candidateSetRange = (candidateSet,start,end)
+
+	def getCandidateCount(self):
+		"""
+		Get the number of candidate relations in the sentence (without creating them)
+
+		:return: Number of candidate relations
+		:rtype: int
+		"""
+		if self.candidateSetRange is None:
+			return len(self._candidateRelationsWithClasses)
+		_,start,end = self.candidateSetRange
+		return end - start
+
 	def __str__(self):
 		tokenWords = [ t.word for t in self.tokens ]
 		return " ".join(tokenWords)
@@ -83,14 +160,19 @@ class Sentence:
 		:type relationtypeClass: int
 		"""
 
-		self.candidateRelationsWithClasses.append((relation,relationtypeClass))
+		# The candidates from a CandidateBuilder are copied out of the CandidateSet first, so that this one can be added
+		candidateRelationsWithClasses = self.candidateRelationsWithClasses
+		candidateRelationsWithClasses.append((relation,relationtypeClass))
+		self.candidateRelationsWithClasses = candidateRelationsWithClasses
 
-	def extractMinSubgraphContainingNodes(self, minSet):
+	def extractMinSubgraphContainingNodes(self, minSet, deadline=None):
 		"""
 		Find the minimum subgraph of the dependency graph that contains the provided set of nodes. Useful for finding dependency-path like structures
 		
 		:param minSet: List of token indices
+		:param deadline: Optional time (as given by time.time()) after which to give up and raise a kindred.ProcessingLimitExceeded
 		:type minSet: List of ints
+		:type deadline: float
 		:return: All the nodes and edges in the minimal subgraph
 		:rtype: Tuple of nodes,edges where nodes is a list of token indices, and edges are the associated dependency edges between those tokens
 		"""
@@ -114,6 +196,8 @@ class Sentence:
 		if setCount1 != setCount2:
 			sys.stderr.write("WARNING. %d node(s) not found in dependency graph!\n" % (setCount1-setCount2))
 		for a,b in itertools.combinations(minSet,2):
+			if not deadline is None and time.time() > deadline:
+				raise kindred.ProcessingLimitExceeded("Ran out of time finding dependency paths in sentence")
 			try:
 				path = nx.shortest_path(G1,a,b)
 				paths[(a,b)] = path
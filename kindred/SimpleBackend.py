@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from kindred.ParserBackend import ParserBackend
+
+# Numbers (with decimal points or commas), words (which can contain hyphens and apostrophes) and single punctuation characters
+_tokenRegex = re.compile(u"\\d+(?:[.,]\\d+)*|\\w+(?:[-'’]\\w+)*|[^\\w\\s]", re.UNICODE)
+
+_sentenceEnders = set([u'.',u'!',u'?',u'…'])
+_closingPunctuation = set([u'"',u"'",u')',u']',u'}',u'”',u'’'])
+
+class SimpleBackend(ParserBackend):
+	"""
+	Parser backend that uses simple rules (written in pure Python) to split text into sentences and tokens. It doesn't need any models so it starts instantly and is very fast. But it doesn't give lemmas, part-of-speech tags or dependency parses, so it can only be used with features that don't need dependencies (e.g. entity types and n-grams). Sentences end at a full stop, question mark or exclamation mark that is followed by a word that doesn't start with a lowercase letter or digit, and at blank lines.
+	"""
+
+	def getName(self):
+		"""
+		Get the name of the backend
+
+		:return: Name of the backend
+		:rtype: str
+		"""
+		return "simple"
+
+	def _parseText(self,text):
+		tokenPositions = [ (match.start(),match.end()) for match in _tokenRegex.finditer(text) ]
+
+		sentences = []
+		sentenceStart = 0
+		afterSentenceEnder = False
+		for i,(startPos,endPos) in enumerate(tokenPositions):
+			word = text[startPos:endPos]
+			if word in _sentenceEnders:
+				afterSentenceEnder = True
+			elif not (afterSentenceEnder and word in _closingPunctuation):
+				afterSentenceEnder = False
+
+			if i+1 < len(tokenPositions):
+				nextStartPos = tokenPositions[i+1][0]
+				gap = text[endPos:nextStartPos]
+				nextCharacter = text[nextStartPos]
+				isSentenceEnd = (afterSentenceEnder and len(gap) > 0 and not (nextCharacter.islower() or nextCharacter.isdigit())) or gap.count(u'\n') >= 2
+			else:
+				isSentenceEnd = True
+
+			if isSentenceEnd:
+				tokens = [ (text[tokenStart:tokenEnd],u'',u'',tokenStart,tokenEnd) for tokenStart,tokenEnd in tokenPositions[sentenceStart:i+1] ]
+				sentences.append((tokens,[]))
+				sentenceStart = i+1
+				afterSentenceEnder = False
+
+		return sentences
+
+	def parseTexts(self,texts,batchSize,entitySpans=None):
+		"""
+		Split a set of texts into sentences and tokens. Each sentence is a tuple of the tokens (a list of (word,lemma,partofspeech,startPos,endPos) tuples with empty lemmas and part-of-speech tags) and an empty list of dependencies
+
+		:param texts: Texts to parse
+		:param batchSize: Not used by this backend
+		:param entitySpans: Not used by this backend
+		:type texts: list of str
+		:type batchSize: int
+		:type entitySpans: list of lists of tuples
+		:return: A list of sentences for each text (in the same order as the texts)
+		:rtype: generator
+		"""
+		for text in texts:
+			yield self._parseText(text)
+
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+import bisect
+import numpy
+
+from kindred.ParserBackend import ParserBackend
+
+# Spacy models that have been loaded in this process (shared by all Parsers)
+_loadedModels = {}
+
+def _getSpacyModel(language):
+	if not language in _loadedModels:
+		# We only load spacy when a model is needed (to allow ReadTheDocs to build the documentation easily)
+		import spacy
+		_loadedModels[language] = spacy.load(language, disable=['ner'])
+	return _loadedModels[language]
+
+def _findSpacyModelPath(language):
+	# Finds where the Spacy model for a language is installed (as a package or, for older versions of Spacy, a shortcut link) without loading it
+	import spacy
+	if spacy.util.is_package(language):
+		return spacy.util.get_package_path(language)
+	getDataPath = getattr(spacy.util,'get_data_path',None)
+	if not getDataPath is None and not getDataPath() is None and (getDataPath() / language).exists():
+		return getDataPath() / language
+	return None
+
+def _getSpacyModelInfo(language):
+	# Gets the metadata and the names of the components (other than ner) of the Spacy model for a language. This is read from the
+	# installed model (so that it isn't loaded just to check the parse cache) unless it has already been loaded in this process.
+	if not language in _loadedModels:
+		import spacy
+		modelPath = _findSpacyModelPath(language)
+		if not modelPath is None:
+			meta = spacy.util.get_model_meta(modelPath)
+			disabled = set(meta.get('disabled',[]) + ['ner'])
+			pipeNames = [ name for name in meta.get('pipeline',[]) if not name in disabled ]
+			return meta,pipeNames
+
+	nlp = _getSpacyModel(language)
+	return nlp.meta,list(nlp.pipe_names)
+
+def _getSpacyMaxLength(language):
+	# The longest text the Spacy model will parse. Unless the model has already been loaded (and possibly changed), this is Spacy's default
+	if language in _loadedModels:
+		return _loadedModels[language].max_length
+
+	import inspect
+	import spacy
+	if hasattr(inspect,'signature'):
+		parameters = inspect.signature(spacy.language.Language.__init__).parameters
+		if 'max_length' in parameters:
+			return parameters['max_length'].default
+	else:
+		# Python 2 doesn't have inspect.signature
+		argspec = inspect.getargspec(spacy.language.Language.__init__)
+		defaults = dict(zip(reversed(argspec.args),reversed(argspec.defaults or ())))
+		if 'max_length' in defaults:
+			return defaults['max_length']
+
+	# Spacy's usual default
+	return 10**6
+
+def _extractSpacySentences(parsed,stringCache,dependencies=True):
+	# Pulls out the token information for a parsed Spacy document as arrays (instead of going through each Spacy token object) and splits it into sentences.
+	# This is used for documents parsed by a SpacyBackend and for those loaded from a DocBin (see loadParses).
+	# String IDs are decoded through the vocabulary with a cache that is shared across documents.
+	if len(parsed) == 0:
+		return []
+
+	from spacy.attrs import ORTH,LEMMA,POS,IDX,HEAD,DEP,SENT_START
+
+	array = parsed.to_array([ORTH,LEMMA,POS,IDX,HEAD,DEP,SENT_START])
+	signedArray = array.view(numpy.int64)
+
+	# Decode each distinct string ID once (words, lemmas, parts of speech and dependency types together)
+	stringColumns = array[:,[0,1,2,5]]
+	uniqueIDs,inverse = numpy.unique(stringColumns,return_inverse=True)
+	strings = parsed.vocab.strings
+	for stringID in uniqueIDs.tolist():
+		if not stringID in stringCache:
+			stringCache[stringID] = strings[stringID]
+	uniqueStrings = [ stringCache[stringID] for stringID in uniqueIDs.tolist() ]
+	decoded = numpy.array(uniqueStrings,dtype=object)[inverse.reshape(stringColumns.shape)]
+
+	words = decoded[:,0].tolist()
+	lemmas = decoded[:,1].tolist()
+	partsofspeech = decoded[:,2].tolist()
+	startPositions = array[:,3].tolist()
+	endPositions = [ startPos+len(word) for startPos,word in zip(startPositions,words) ]
+	heads = numpy.arange(len(parsed)) + signedArray[:,4]
+	dependencyTypes = decoded[:,3].tolist()
+
+	# The first token always starts a sentence (even if Spacy doesn't mark it)
+	sentenceStarts = signedArray[:,6] == 1
+	sentenceStarts[0] = True
+	boundaries = numpy.flatnonzero(sentenceStarts).tolist() + [len(parsed)]
+
+	sentences = []
+	for sentenceStart,sentenceEnd in zip(boundaries,boundaries[1:]):
+		tokens = list(zip(words[sentenceStart:sentenceEnd],lemmas[sentenceStart:sentenceEnd],partsofspeech[sentenceStart:sentenceEnd],startPositions[sentenceStart:sentenceEnd],endPositions[sentenceStart:sentenceEnd]))
+
+		if dependencies:
+			sentenceHeads = (heads[sentenceStart:sentenceEnd] - sentenceStart).tolist()
+			dependencies = list(zip(sentenceHeads,range(sentenceEnd-sentenceStart),dependencyTypes[sentenceStart:sentenceEnd]))
+		else:
+			dependencies = []
+
+		sentences.append((tokens,dependencies))
+
+	return sentences
+
+def preloadSpacyModel(language='en'):
+	"""
+	Load the Spacy model for a language so that it is ready for any Parser (including those created by a CandidateBuilder or RelationClassifier). Each model is only loaded once in a process, so this is not needed normally. But loading it before starting worker processes (e.g. with multiprocessing) means that they share the model's memory instead of each loading their own copy.
+
+	:param language: Language of model to load (en/de/es/pt/fr/it/nl)
+	:type language: str
+	"""
+
+	assert language in SpacyBackend.acceptedLanguages, "Language for parser (%s) not in accepted languages: %s" % (language,str(SpacyBackend.acceptedLanguages))
+	_getSpacyModel(language)
+
+class SpacyBackend(ParserBackend):
+	"""
+	Parser backend that uses Spacy to split sentences, tokenize, and (optionally) get lemmas, part-of-speech tags and dependency parses. The Spacy model is loaded the first time it is needed and is then shared by all backends (and Parsers) in the process.
+	"""
+
+	acceptedLanguages = ['en','de','es','pt','fr','it','nl']
+
+	# Spacy components that only add part-of-speech and lemma information (which none of the features use)
+	taggingComponents = ['tagger','attribute_ruler','lemmatizer','morphologizer']
+
+	providesDependencies = True
+
+	def __init__(self,language='en',tagging=True,dependencies=True,entitySentencesOnly=False):
+		"""
+		Create a Spacy backend for a language. Note that the language model needs to be downloaded first (e.g. python -m spacy download en).
+
+		:param language: Language to parse (en/de/es/pt/fr/it/nl)
+		:param tagging: Whether to run the Spacy components that give lemmas and part-of-speech tags
+		:param dependencies: Whether to dependency parse the sentences. If not, the sentences are split using fast rules instead of the dependency parser and none of the other components are run
+		:param entitySentencesOnly: Whether to split sentences using fast rules first and then only tag and dependency parse the sentences that contain at least two entities
+		:type language: str
+		:type tagging: bool
+		:type dependencies: bool
+		:type entitySentencesOnly: bool
+		"""
+
+		assert language in SpacyBackend.acceptedLanguages, "Language for parser (%s) not in accepted languages: %s" % (language,str(SpacyBackend.acceptedLanguages))
+
+		self.language = language
+		self.tagging = tagging
+		self.dependencies = dependencies
+		self.entitySentencesOnly = entitySentencesOnly
+
+	@property
+	def nlp(self):
+		"""
+		The (shared) Spacy model used by this backend
+		"""
+		return _getSpacyModel(self.language)
+
+	def getName(self):
+		"""
+		Get the name of the Spacy model (with its version) and the components that are used. This is read from the installed model without loading it (if it hasn't been loaded already)
+
+		:return: Name of the backend
+		:rtype: str
+		"""
+		meta,pipeNames = _getSpacyModelInfo(self.language)
+		components = [ name for name in pipeNames if not name in self._getDisabledComponents(pipeNames) ]
+		if not self.dependencies or self.entitySentencesOnly:
+			components.append('sentencizer')
+		return "%s_%s-%s %s" % (meta.get('lang',self.language),meta.get('name',''),meta.get('version',''),",".join(components))
+
+	def getMaxLength(self):
+		"""
+		Get the longest text that the Spacy model will parse (without loading the model if it hasn't been loaded already)
+
+		:return: Maximum length of text (in characters)
+		:rtype: int
+		"""
+		return _getSpacyMaxLength(self.language)
+
+	def load(self):
+		"""
+		Load the Spacy model (if it hasn't already been loaded in this process)
+		"""
+		_getSpacyModel(self.language)
+
+	def _getDisabledComponents(self,pipeNames=None):
+		if not self.dependencies:
+			return list(self.nlp.pipe_names if pipeNames is None else pipeNames)
+		elif not self.tagging:
+			return SpacyBackend.taggingComponents
+		else:
+			return []
+
+	def _runComponents(self,docs,batchSize):
+		# Run the (enabled) components of the Spacy pipeline on documents that have already been tokenized
+		disabled = self._getDisabledComponents()
+		for name,component in self.nlp.pipeline:
+			if name in disabled:
+				continue
+			if hasattr(component,'pipe'):
+				docs = component.pipe(docs, batch_size=batchSize)
+			else:
+				docs = map(component,docs)
+		return docs
+
+	def parseTexts(self,texts,batchSize,entitySpans=None):
+		"""
+		Run Spacy on a set of texts and give back the sentences found in each one. Each sentence is a tuple of the tokens (a list of (word,lemma,partofspeech,startPos,endPos) tuples) and the dependencies (a list of (headIndex,tokenIndex,dependencyType) tuples)
+
+		:param texts: Texts to parse
+		:param batchSize: Number of texts that Spacy should process in each batch
+		:param entitySpans: Locations of entities in each text as (startPos,endPos,entityIndex) tuples. These are only needed (and used) with entitySentencesOnly
+		:type texts: list of str
+		:type batchSize: int
+		:type entitySpans: list of lists of tuples
+		:return: A list of sentences for each text (in the same order as the texts)
+		:rtype: generator
+		"""
+		if self.dependencies and self.entitySentencesOnly:
+			for parsedSentences in self._parseEntitySentences(texts,batchSize,entitySpans):
+				yield parsedSentences
+			return
+
+		if self.dependencies:
+			parsedTexts = self.nlp.pipe(texts, batch_size=batchSize, disable=self._getDisabledComponents())
+		else:
+			# Only tokenize and use simple rules to split sentences
+			from spacy.pipeline import Sentencizer
+			sentencizer = Sentencizer()
+			parsedTexts = ( sentencizer(parsed) for parsed in self.nlp.tokenizer.pipe(texts, batch_size=batchSize) )
+
+		stringCache = {}
+		for parsed in parsedTexts:
+			parsedSentences = _extractSpacySentences(parsed,stringCache,self.dependencies)
+
+			# Let go of the Spacy document before handing back its sentences
+			del parsed
+
+			yield parsedSentences
+
+	def _parseEntitySentences(self,texts,batchSize,entitySpans):
+		# Splits the texts into sentences using simple rules and then only runs the full Spacy pipeline on the sentences that
+		# contain at least two entities. The entity spans for each text are a list of (startPos,endPos,entityIndex).
+		from spacy.pipeline import Sentencizer
+		sentencizer = Sentencizer()
+
+		stringCache = {}
+		for batchStart in range(0,len(texts),batchSize):
+			batchTexts = texts[batchStart:batchStart+batchSize]
+			batchEntitySpans = entitySpans[batchStart:batchStart+batchSize]
+
+			batchSentences,sentencesToParse = [],[]
+			for textIndex,tokenized in enumerate(self.nlp.tokenizer.pipe(batchTexts, batch_size=batchSize)):
+				tokenized = sentencizer(tokenized)
+
+				parsedSentences = [ (tokens,[]) for tokens,_ in _extractSpacySentences(tokenized,stringCache,self.dependencies) ]
+				batchSentences.append(parsedSentences)
+
+				sentenceStarts = [ tokens[0][3] for tokens,_ in parsedSentences ]
+				sentenceEnds = [ tokens[-1][4] for tokens,_ in parsedSentences ]
+				entitiesInSentences = [ set() for _ in parsedSentences ]
+				for startPos,endPos,entityIndex in batchEntitySpans[textIndex]:
+					sentenceIndex = max(0,bisect.bisect_right(sentenceStarts,startPos)-1)
+					while sentenceIndex < len(parsedSentences) and sentenceStarts[sentenceIndex] < endPos:
+						if sentenceEnds[sentenceIndex] > startPos:
+							entitiesInSentences[sentenceIndex].add(entityIndex)
+						sentenceIndex += 1
+
+				for sentenceIndex,sentence in enumerate(tokenized.sents):
+					if len(entitiesInSentences[sentenceIndex]) >= 2:
+						sentencesToParse.append((textIndex,sentenceIndex,sentence.start_char,sentence.as_doc()))
+
+			# Parse the chosen sentences (from all the texts in this batch) together and swap them in
+			parsedDocs = self._runComponents([ doc for _,_,_,doc in sentencesToParse ],batchSize)
+			replacements = defaultdict(dict)
+			for (textIndex,sentenceIndex,offset,_),parsed in zip(sentencesToParse,parsedDocs):
+				replacements[textIndex][sentenceIndex] = [ ([ (word,lemma,partofspeech,startPos+offset,endPos+offset) for word,lemma,partofspeech,startPos,endPos in tokens ],dependencies) for tokens,dependencies in _extractSpacySentences(parsed,stringCache,self.dependencies) ]
+
+			for textIndex,parsedSentences in enumerate(batchSentences):
+				textReplacements = replacements[textIndex]
+				yield [ sentence for sentenceIndex,original in enumerate(parsedSentences) for sentence in textReplacements.get(sentenceIndex,[original]) ]
+
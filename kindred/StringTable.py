@@ -0,0 +1,65 @@
+class StringTable:
+	"""
+	Table of strings that gives each distinct string an integer ID. Each corpus has one that is used to intern the entity types, relation types, argument names, words, lemmas, part-of-speech tags and dependency types in it, so that each distinct string is only stored once (and lookups using them are faster). ColumnarSentences store the IDs from it instead of the strings.
+	"""
+
+	def __init__(self):
+		"""
+		Create an empty string table
+		"""
+
+		self.strings = []
+		self.stringToID = {}
+
+	def getID(self,string):
+		"""
+		Get the ID for a string (adding it to the table if it isn't there already)
+
+		:param string: String to look up
+		:type string: str
+		:return: ID of the string
+		:rtype: int
+		"""
+
+		stringID = self.stringToID.get(string)
+		if stringID is None:
+			stringID = len(self.strings)
+			self.strings.append(string)
+			self.stringToID[string] = stringID
+		return stringID
+
+	def intern(self,string):
+		"""
+		Get the shared copy of a string (adding it to the table if it isn't there already)
+
+		:param string: String to look up
+		:type string: str
+		:return: The copy of the string in the table
+		:rtype: str
+		"""
+
+		return self.strings[self.getID(string)]
+
+	def getString(self,stringID):
+		"""
+		Get the string for an ID
+
+		:param stringID: ID of the string
+		:type stringID: int
+		:return: The string
+		:rtype: str
+		"""
+
+		return self.strings[stringID]
+
+	def __len__(self):
+		return len(self.strings)
+
+	def __getstate__(self):
+		# The lookup from strings to IDs can be rebuilt so there's no need to store it
+		return {'strings':self.strings}
+
+	def __setstate__(self,state):
+		self.strings = state['strings']
+		self.stringToID = { string:stringID for stringID,string in enumerate(self.strings) }
+
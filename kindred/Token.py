@@ -1,8 +1,11 @@
 
-class Token:
+class Token(object):
 	"""
 	Individual word with lemma, part-of-speech and location in text.
 	"""
+
+	# Use slots (instead of a dictionary for each token) as there can be millions of tokens in a parsed corpus
+	__slots__ = ['word','lemma','partofspeech','startPos','endPos']
 	
 	def __init__(self,word,lemma,partofspeech,startPos,endPos):
 		"""
@@ -31,3 +34,23 @@ class Token:
 		
 	def __repr__(self):
 		return self.__str__()
+
+	def __eq__(self, other):
+		"""Override the default Equals behavior"""
+		if isinstance(other, self.__class__):
+			return (self.word,self.lemma,self.partofspeech,self.startPos,self.endPos) == (other.word,other.lemma,other.partofspeech,other.startPos,other.endPos)
+		return False
+
+	def __ne__(self, other):
+		"""Define a non-equality test"""
+		return not self.__eq__(other)
+
+	def __hash__(self):
+		return hash((self.word,self.lemma,self.partofspeech,self.startPos,self.endPos))
+
+	def __getstate__(self):
+		return { name:getattr(self,name) for name in Token.__slots__ }
+
+	def __setstate__(self, state):
+		for name,value in state.items():
+			setattr(self,name,value)
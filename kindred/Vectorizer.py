@@ -1,127 +1,178 @@
 
-from collections import Counter
+from collections import Counter,defaultdict
 from sklearn.feature_extraction import DictVectorizer
 from sklearn.feature_extraction.text import TfidfTransformer
 from scipy.sparse import hstack
+import time
 
 import kindred
 
-def _doEntityTypes(corpus):
+def _iterCandidates(corpus,candidateSet):
+	# Goes through the candidate relations (in order) giving the document index and sentence that each is in and its entity IDs
+	for docIndex,sentenceIndex,entityIDs in zip(candidateSet.documentIndices.tolist(),candidateSet.sentenceIndices.tolist(),candidateSet.entityIDs.tolist()):
+		yield docIndex,corpus.documents[docIndex].sentences[sentenceIndex],entityIDs
+
+class _DependencyPathTimer(object):
+	# Finds dependency paths while keeping track of the time spent on each document (across all the features) so that a document
+	# that goes over the time limit can be quarantined. The limit is the maxSeconds of a kindred.ProcessingLimits (or None).
+	def __init__(self,limits):
+		self.limits = limits
+		self.timeSpent = defaultdict(float)
+		self.timedOutDocuments = {}
+
+	def getEdges(self,docIndex,sentence,nodes):
+		# Gives back the edges of the minimal subgraph containing the nodes, or None if the document has run out of time
+		if docIndex in self.timedOutDocuments:
+			return None
+
+		deadline = None if self.limits is None else self.limits.getDeadline()
+		if deadline is None:
+			_,edges = sentence.extractMinSubgraphContainingNodes(nodes)
+			return edges
+
+		start = time.time()
+		try:
+			_,edges = sentence.extractMinSubgraphContainingNodes(nodes,deadline-self.timeSpent[docIndex])
+		except kindred.ProcessingLimitExceeded:
+			self.timedOutDocuments[docIndex] = "Ran out of time finding dependency paths (limit is %s seconds)" % str(self.limits.maxSeconds)
+			return None
+		finally:
+			self.timeSpent[docIndex] += time.time() - start
+		return edges
+
+def _doEntityTypes(corpus,candidateSet):
 	entityMapping = corpus.getEntityMapping()
 	data = []
-	for cr in corpus.getCandidateRelations():
+	for entityIDs in candidateSet.entityIDs.tolist():
 		tokenInfo = {}
-		for argI,eID in enumerate(cr.entityIDs):
+		for argI,eID in enumerate(entityIDs):
 			eType = entityMapping[eID].entityType
 			argName = "selectedtokentypes_%d_%s" % (argI,eType)
 			tokenInfo[argName] = 1
 		data.append(tokenInfo)
 	return data
 
-def _doUnigramsBetweenEntities(corpus):
-	data = []	
-	for doc in corpus.documents:
-		for sentence in doc.sentences:
-			for cr,_ in sentence.candidateRelationsWithClasses:
-				dataForThisCR = Counter()
-
-				assert len(cr.entityIDs) == 2
-				pos1 = sentence.entityIDToLoc[cr.entityIDs[0]]
-				pos2 = sentence.entityIDToLoc[cr.entityIDs[1]]
-				
-				if max(pos1) < min(pos2):
-					startPos,endPos = max(pos1)+1,min(pos2)
-				else:
-					startPos,endPos = max(pos2)+1,min(pos1)
-
-				tokenData = [ sentence.tokens[i].word.lower() for i in range(startPos,endPos) ]
-				for t in tokenData:
-					dataForThisCR[u"ngrams_betweenentities_%s" % t] += 1
-				data.append(dataForThisCR)
+def _doUnigramsBetweenEntities(corpus,candidateSet):
+	data = []
+	lastSentence = None
+	for _,sentence,entityIDs in _iterCandidates(corpus,candidateSet):
+		if not sentence is lastSentence:
+			# Lowercase each word once per sentence (instead of for every candidate relation)
+			featureNames = [ u"ngrams_betweenentities_%s" % t.word.lower() for t in sentence.tokens ]
+			lastSentence = sentence
+
+		dataForThisCR = Counter()
+
+		assert len(entityIDs) == 2
+		pos1 = sentence.entityIDToLoc[entityIDs[0]]
+		pos2 = sentence.entityIDToLoc[entityIDs[1]]
+		
+		if max(pos1) < min(pos2):
+			startPos,endPos = max(pos1)+1,min(pos2)
+		else:
+			startPos,endPos = max(pos2)+1,min(pos1)
+
+		for featureName in featureNames[startPos:endPos]:
+			dataForThisCR[featureName] += 1
+		data.append(dataForThisCR)
 
 	return data
 
-def _doDependencyPathEdges(corpus):
-	data = []	
-	for doc in corpus.documents:
-		for sentence in doc.sentences:
-			for cr,_ in sentence.candidateRelationsWithClasses:
-				dataForThisCR = Counter()
+def _doDependencyPathEdges(corpus,candidateSet,timer):
+	data = []
+	for docIndex,sentence,entityIDs in _iterCandidates(corpus,candidateSet):
+		dataForThisCR = Counter()
 
-				assert len(cr.entityIDs) == 2
-				pos1 = sentence.entityIDToLoc[cr.entityIDs[0]]
-				pos2 = sentence.entityIDToLoc[cr.entityIDs[1]]
+		assert len(entityIDs) == 2
+		pos1 = sentence.entityIDToLoc[entityIDs[0]]
+		pos2 = sentence.entityIDToLoc[entityIDs[1]]
 
-				combinedPos = pos1 + pos2
+		combinedPos = pos1 + pos2
 
-				nodes,edges = sentence.extractMinSubgraphContainingNodes(combinedPos)
-				for a,b,dependencyType in edges:
-					dataForThisCR[u"dependencypathelements_%s" % dependencyType] += 1
-				data.append(dataForThisCR)
+		edges = timer.getEdges(docIndex,sentence,combinedPos)
+		if edges is None:
+			edges = []
+		for a,b,dependencyType in edges:
+			dataForThisCR[u"dependencypathelements_%s" % dependencyType] += 1
+		data.append(dataForThisCR)
 
 	return data
 
-def _doDependencyPathEdgesNearEntities(corpus):
-	data = []	
-	for doc in corpus.documents:
-		for sentence in doc.sentences:
-			for cr,_ in sentence.candidateRelationsWithClasses:
-				dataForThisCR = Counter()
+def _doDependencyPathEdgesNearEntities(corpus,candidateSet,timer):
+	data = []
+	for docIndex,sentence,entityIDs in _iterCandidates(corpus,candidateSet):
+		dataForThisCR = Counter()
 
-				allEntityLocs = []
-				for eID in cr.entityIDs:
-					allEntityLocs += sentence.entityIDToLoc[eID]
-				
-				nodes,edges = sentence.extractMinSubgraphContainingNodes(allEntityLocs)
-				for i,eID in enumerate(cr.entityIDs):
+		allEntityLocs = []
+		for eID in entityIDs:
+			allEntityLocs += sentence.entityIDToLoc[eID]
+		
+		edges = timer.getEdges(docIndex,sentence,allEntityLocs)
+		if edges is None:
+			edges = []
+		for i,eID in enumerate(entityIDs):
 
-					pos = sentence.entityIDToLoc[eID]
+			pos = sentence.entityIDToLoc[eID]
 
-					for a,b,dependencyType in edges:
-						if a in pos:
-							dataForThisCR[u"dependencypathnearselectedtoken_%d_%s" % (i,dependencyType)] += 1
-				data.append(dataForThisCR)
+			for a,b,dependencyType in edges:
+				if a in pos:
+					dataForThisCR[u"dependencypathnearselectedtoken_%d_%s" % (i,dependencyType)] += 1
+		data.append(dataForThisCR)
 
 	return data
 
-def _doBigrams(corpus):
-	data = []	
-	for doc in corpus.documents:
-		for sentence in doc.sentences:
-			for cr,_ in sentence.candidateRelationsWithClasses:
-				dataForThisCR = Counter()
-
-				for _ in cr.entityIDs:
-
-					startPos = 0
-					endPos = len(sentence.tokens)
+def _doBigrams(corpus,candidateSet):
+	data = []
+	lastSentence = None
+	for _,sentence,entityIDs in _iterCandidates(corpus,candidateSet):
+		if not sentence is lastSentence:
+			# The bigrams are for the whole sentence so they are only counted once per sentence
+			words = [ t.word.lower() for t in sentence.tokens ]
+			sentenceBigrams = Counter( u"bigrams_%s_%s" % (a,b) for a,b in zip(words,words[1:]) )
+			lastSentence = sentence
 
-					tokenData = [ (sentence.tokens[i].word.lower(),sentence.tokens[i+1].word.lower()) for i in range(startPos,endPos-1) ]
-					for t in tokenData:
-						dataForThisCR[u"bigrams_%s_%s" % t] += 1
-				data.append(dataForThisCR)
+		dataForThisCR = Counter()
+		for _ in entityIDs:
+			dataForThisCR.update(sentenceBigrams)
+		data.append(dataForThisCR)
 
 	return data
 
+# The function for each feature, whether it is never normalized with TF-IDF and whether it needs dependency parses
+_featureInfo = {}
+_featureInfo['entityTypes'] = {'func':_doEntityTypes,'never_tfidf':True,'needsDependencies':False}
+_featureInfo['unigramsBetweenEntities'] = {'func':_doUnigramsBetweenEntities,'never_tfidf':False,'needsDependencies':False}
+_featureInfo['bigrams'] = {'func':_doBigrams,'never_tfidf':False,'needsDependencies':False}
+_featureInfo['dependencyPathEdges'] = {'func':_doDependencyPathEdges,'never_tfidf':True,'needsDependencies':True}
+_featureInfo['dependencyPathEdgesNearEntities'] = {'func':_doDependencyPathEdgesNearEntities,'never_tfidf':True,'needsDependencies':True}
+
 class Vectorizer:
 	"""
 	Vectorizes set of candidate relations into scipy sparse matrix.
 	"""
+
+	# Shared by all vectorizers (and used by the Parser to check which features need dependency parses)
+	featureInfo = _featureInfo
+
+	# Default for vectorizers pickled before this option was added
+	limits = None
 	
-	def __init__(self,featureChoice=None,tfidf=True):
+	def __init__(self,featureChoice=None,tfidf=True,limits=None):
 		"""
 		Constructor for vectorizer class with options for what features to use and whether to normalize using TFIDF
 		
 		:param featureChoice: List of features (can be one or a set of the following: 'entityTypes', 'unigramsBetweenEntities', 'bigrams', 'dependencyPathEdges', 'dependencyPathEdgesNearEntities'). Set as None to use all of them. 
 		:param tfidf: Whether to normalize n-gram based features using term frequency-inverse document frequency
+		:param limits: Optional limits with a maximum time to spend finding dependency paths in each document. A document that runs out of time is quarantined and its candidate relations are given empty rows in the matrix
 		:type featureChoice: list of str
 		:type tfidf: bool
+		:type limits: kindred.ProcessingLimits
 		"""
+		assert limits is None or isinstance(limits,kindred.ProcessingLimits)
 		
 		self.fitted = False
 		
-		self._registerFunctions()
-		validFeatures = self.featureInfo.keys()
+		validFeatures = _featureInfo.keys()
 
 		if featureChoice is None:
 			self.chosenFeatures = ['entityTypes','unigramsBetweenEntities','bigrams','dependencyPathEdges','dependencyPathEdgesNearEntities']
@@ -132,19 +183,11 @@ class Vectorizer:
 			self.chosenFeatures = featureChoice
 		
 		self.tfidf = tfidf
-
+		self.limits = limits
 
 		self.dictVectorizers = {}
 		self.tfidfTransformers = {}
 
-	def _registerFunctions(self):
-		self.featureInfo = {}
-		self.featureInfo['entityTypes'] = {'func':_doEntityTypes,'never_tfidf':True}
-		self.featureInfo['unigramsBetweenEntities'] = {'func':_doUnigramsBetweenEntities,'never_tfidf':False}
-		self.featureInfo['bigrams'] = {'func':_doBigrams,'never_tfidf':False}
-		self.featureInfo['dependencyPathEdges'] = {'func':_doDependencyPathEdges,'never_tfidf':True}
-		self.featureInfo['dependencyPathEdgesNearEntities'] = {'func':_doDependencyPathEdgesNearEntities,'never_tfidf':True}
-				
 	def getFeatureNames(self):
 		"""
 		Get the names for each feature (i.e. each column in matrix generated by the fit_transform() and transform() functions. Fit_transform() must have already been used, i.e. the vectorizer needs to have been fit to training data.
@@ -163,15 +206,29 @@ class Vectorizer:
 
 
 
-	def _vectorize(self,corpus,fit):
+	def _vectorize(self,corpus,candidateSet,fit):
 		assert isinstance(corpus,kindred.Corpus)
+
+		# The dependency path features are found first, so that the candidates of any documents that run out of time can be
+		# left out of every feature
+		timer = _DependencyPathTimer(self.limits)
+		dependencyData = {}
+		for feature in self.chosenFeatures:
+			assert feature in _featureInfo.keys()
+			if _featureInfo[feature]['needsDependencies']:
+				dependencyData[feature] = _featureInfo[feature]['func'](corpus,candidateSet,timer)
+		timedOutCandidates = [ i for i,docIndex in enumerate(candidateSet.documentIndices.tolist()) if docIndex in timer.timedOutDocuments ]
 			
 		matrices = []
 		for feature in self.chosenFeatures:
-			assert feature in self.featureInfo.keys()
-			featureFunction = self.featureInfo[feature]['func']
-			never_tfidf = self.featureInfo[feature]['never_tfidf']
-			data = featureFunction(corpus)
+			featureFunction = _featureInfo[feature]['func']
+			never_tfidf = _featureInfo[feature]['never_tfidf']
+			if feature in dependencyData:
+				data = dependencyData.pop(feature)
+			else:
+				data = featureFunction(corpus,candidateSet)
+			for i in timedOutCandidates:
+				data[i] = {}
 			notEmpty = any( len(d)>0 for d in data )
 			if fit:
 				if notEmpty:
@@ -190,6 +247,9 @@ class Vectorizer:
 					else:
 						matrices.append(self.dictVectorizers[feature].transform(data))
 
+		for docIndex,reason in sorted(timer.timedOutDocuments.items()):
+			corpus.documents[docIndex].quarantine(reason)
+
 		mergedMatrix = hstack(matrices)
 		return mergedMatrix
 			
@@ -203,9 +263,10 @@ class Vectorizer:
 		:rtype: scipy.sparse.csr.csr_matrix
 		"""
 		assert self.fitted == False
-		assert len(corpus.getCandidateRelations()) > 0, "No candidate relations found in corpus"
+		candidateSet = corpus.getCandidateSet()
+		assert len(candidateSet) > 0, "No candidate relations found in corpus"
 		self.fitted = True
-		return self._vectorize(corpus,True)
+		return self._vectorize(corpus,candidateSet,True)
 	
 	def transform(self,corpus):
 		"""
@@ -217,8 +278,9 @@ class Vectorizer:
 		:rtype: scipy.sparse.csr.csr_matrix
 		"""
 		assert self.fitted == True
-		assert len(corpus.getCandidateRelations()) > 0, "No candidate relations found in corpus"
-		return self._vectorize(corpus,False)
+		candidateSet = corpus.getCandidateSet()
+		assert len(candidateSet) > 0, "No candidate relations found in corpus"
+		return self._vectorize(corpus,candidateSet,False)
 		
 		
 	
@@ -1,3 +1,5 @@
+from kindred.version import __version__
+
 
 # Data types
 from kindred.Corpus import Corpus
@@ -6,16 +8,24 @@ from kindred.Entity import Entity
 from kindred.Relation import Relation
 from kindred.Token import Token
 from kindred.Sentence import Sentence
+from kindred.StringTable import StringTable
+from kindred.ColumnarSentence import ColumnarSentence
+from kindred.CandidateSet import CandidateSet
 
 # Components
+from kindred.ParserBackend import ParserBackend
+from kindred.SpacyBackend import SpacyBackend,preloadSpacyModel
+from kindred.SimpleBackend import SimpleBackend
 from kindred.Parser import Parser
+from kindred.ParseCache import ParseCache
+from kindred.ProcessingLimits import ProcessingLimits,ProcessingLimitExceeded
 from kindred.CandidateBuilder import CandidateBuilder
 from kindred.Vectorizer import Vectorizer
 from kindred.RelationClassifier import RelationClassifier
 from kindred.LogisticRegressionWithThreshold import LogisticRegressionWithThreshold
 
 # General functions
-from kindred.loadFunctions import loadDoc,loadDocs,loadDir,iterLoadDataFromBioc
+from kindred.loadFunctions import loadDoc,loadDocs,loadDir,iterLoadDataFromBioc,loadParses
 from kindred.saveFunctions import save
 from kindred.evalFunctions import evaluate
 
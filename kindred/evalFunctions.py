@@ -22,10 +22,10 @@ def evaluate(goldCorpus,testCorpus,metric='f1score',display=False):
 
 	TPs,FPs,FNs = Counter(),Counter(),Counter()
 	
-	goldTuples = [ (r.relationType,tuple(r.entityIDs)) for r in goldCorpus.getRelations() ]
-	testTuples = [ (r.relationType,tuple(r.entityIDs)) for r in testCorpus.getRelations() ]
+	goldTuples = set( (r.relationType,tuple(r.entityIDs)) for r in goldCorpus.getRelations() )
+	testTuples = set( (r.relationType,tuple(r.entityIDs)) for r in testCorpus.getRelations() )
 
-	totalSet = set(goldTuples + testTuples)
+	totalSet = goldTuples | testTuples
 	for relation in totalSet:
 		inGold = relation in goldTuples
 		inTest = relation in testTuples
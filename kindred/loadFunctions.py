@@ -42,7 +42,7 @@ def loadEntity(line,text):
 
 	assert chunkTest == tokensTest , u"For id=" + entityID + ", tokens '" + tokens.encode('ascii', 'ignore') + "' don't match up with positions: " + str(positions)
 	
-	entity = kindred.Entity(typeName, tokensTest, positions, entityID)
+	entity = kindred.Entity._createTrusted(typeName, tokensTest, positions, entityID)
 
 	return entity
 	
@@ -85,7 +85,7 @@ def loadRelation(line,ignoreComplexRelations=True):
 	entityIDs = [ entityID for argName,entityID in arguments ]
 	argNames = [ argName for argName,entityID in arguments ]
 
-	relation = kindred.Relation(relationType, entityIDs, argNames)
+	relation = kindred.Relation._createTrusted(relationType, entityIDs, argNames)
 	return relation
 	
 # TODO: Deal with complex relations more clearly
@@ -124,7 +124,7 @@ def loadDataFromSTFormat(txtFile,a1File,a2File,verbose=False,ignoreEntities=[],i
 
 	baseTxtFile = os.path.basename(txtFile)
 	baseFilename = baseTxtFile[0:-4]
-	combinedData = kindred.Document(text,entities=entities,relations=relations,sourceFilename=baseFilename)
+	combinedData = kindred.Document._createTrusted(text,entities=entities,relations=relations,sourceFilename=baseFilename)
 			
 	return combinedData
 
@@ -192,14 +192,14 @@ def parseSimpleTag_helper(node,currentPosition=0,ignoreEntities=[]):
 				entityIDs = [ entityID for argName,entityID in arguments]
 				argNames = [ argName for argName,entityID in arguments]
 				
-				r = kindred.Relation(relationType=relationType,entityIDs=entityIDs,argNames=argNames)
+				r = kindred.Relation._createTrusted(relationType=relationType,entityIDs=entityIDs,argNames=argNames)
 				relations.append(r)
 			else: # Entity
 				entityType = s.tagName
 				sourceEntityID = s.getAttribute('id')
 				position = [(currentPosition+len(text),currentPosition+len(text)+len(insideText))]
 				if not entityType in ignoreEntities:
-					e = kindred.Entity(entityType,insideText,position,sourceEntityID=sourceEntityID)
+					e = kindred.Entity._createTrusted(entityType,insideText,position,sourceEntityID=sourceEntityID)
 					entities.append(e)
 				
 			text += insideText
@@ -240,7 +240,7 @@ def parseSimpleTag(text,ignoreEntities=[]):
 					
 	entities = mergeEntitiesWithMatchingIDs(unmergedEntities)
 			
-	combinedData = kindred.Document(text,entities=entities,relations=relations)
+	combinedData = kindred.Document._createTrusted(text,entities=entities,relations=relations)
 	return combinedData
 
 def convertBiocDocToKindredDocs(document):
@@ -271,7 +271,7 @@ def convertBiocDocToKindredDocs(document):
 				segments.append(text[startPos:endPos])
 			
 			entityText = " ".join(segments)
-			e = kindred.Entity(entityType,entityText,position,sourceEntityID)
+			e = kindred.Entity._createTrusted(entityType,entityText,position,sourceEntityID)
 			entities.append(e)
 			
 		for r in passage.relations:
@@ -287,12 +287,12 @@ def convertBiocDocToKindredDocs(document):
 			entityIDs = [ entityID for argName,entityID in arguments]
 			argNames = [ argName for argName,entityID in arguments]
 			
-			r = kindred.Relation(relationType=relationType,entityIDs=entityIDs,argNames=argNames)
+			r = kindred.Relation._createTrusted(relationType=relationType,entityIDs=entityIDs,argNames=argNames)
 			relations.append(r)
 		
 		metadata = dict(document.infons)
 		metadata.update(passage.infons)
-		relData = kindred.Document(text,entities=entities,relations=relations,metadata=metadata)
+		relData = kindred.Document._createTrusted(text,entities=entities,relations=relations,metadata=metadata)
 		kindredDocs.append(relData)
 
 	return kindredDocs
@@ -462,3 +462,139 @@ def loadDir(dataFormat,directory,verbose=False,ignoreEntities=[],ignoreComplexRe
 	return corpus
 			
 			
+
+def _iterDocBinParses(path):
+	import spacy
+	try:
+		from spacy.tokens import DocBin
+	except ImportError:
+		raise RuntimeError("Loading parses from a DocBin needs Spacy 2.2 or later (version %s is installed)" % spacy.__version__)
+	from spacy.vocab import Vocab
+	from spacy.pipeline import Sentencizer
+	from kindred.SpacyBackend import _extractSpacySentences
+
+	with open(path,'rb') as f:
+		docBin = DocBin().from_bytes(f.read())
+
+	stringCache = {}
+	sentencizer = Sentencizer()
+	for doc in docBin.get_docs(Vocab()):
+		# Older versions of Spacy have is_parsed and is_sentenced instead of has_annotation
+		if hasattr(doc,'has_annotation'):
+			hasDependencies,hasSentences = doc.has_annotation("DEP"),doc.has_annotation("SENT_START")
+		else:
+			hasDependencies,hasSentences = doc.is_parsed,doc.is_sentenced
+
+		# Use simple rules to split sentences if they haven't already been split
+		if not hasDependencies and not hasSentences:
+			doc = sentencizer(doc)
+
+		yield doc.text,_extractSpacySentences(doc,stringCache,hasDependencies)
+
+def _iterCoNLLUDocuments(path):
+	# Gives back the sentences of each document (separated by "# newdoc" comments) as lists of CoNLL-U fields for each word.
+	# Words that are part of a multiword token also get its fields (as the last item) so that they can use its location in the text.
+	sentences,sentence = [],[]
+	multiwordToken,multiwordEnd = None,None
+	with codecs.open(path, "r", "utf-8") as f:
+		for line in f:
+			line = line.rstrip('\r\n')
+			if line.startswith('# newdoc'):
+				if len(sentence) > 0:
+					sentences.append(sentence)
+				if len(sentences) > 0:
+					yield sentences
+				sentences,sentence = [],[]
+			elif line.startswith('#'):
+				continue
+			elif line.strip() == '':
+				if len(sentence) > 0:
+					sentences.append(sentence)
+				sentence = []
+				multiwordToken,multiwordEnd = None,None
+			else:
+				fields = line.split('\t')
+				assert len(fields) == 10, "CoNLL-U lines must have 10 tab-separated fields: %s" % line
+				wordID = fields[0]
+				if '-' in wordID:
+					multiwordToken = fields
+					multiwordEnd = int(wordID.split('-')[1])
+				elif not '.' in wordID:
+					if not multiwordToken is None and int(wordID) <= multiwordEnd:
+						sentence.append(fields + [multiwordToken])
+					else:
+						sentence.append(fields + [None])
+						multiwordToken = None
+
+	if len(sentence) > 0:
+		sentences.append(sentence)
+	if len(sentences) > 0:
+		yield sentences
+
+def _getCoNLLUTokenRange(misc):
+	for item in misc.split('|'):
+		if item.startswith('TokenRange='):
+			start,end = item[len('TokenRange='):].split(':')
+			return int(start),int(end)
+	return None
+
+def _alignCoNLLUDocument(text,sentences):
+	# Finds the locations of the CoNLL-U words in the document text (using TokenRange in the MISC field if it is there)
+	# and gives back parsed sentences in the form used by the Parser
+	parsedSentences = []
+	position = 0
+	for sentence in sentences:
+		tokens,dependencies = [],[]
+		for i,(wordID,form,lemma,upos,_,_,head,deprel,_,misc,multiwordToken) in enumerate(sentence):
+			location = form if multiwordToken is None else multiwordToken[1]
+			locationMisc = misc if multiwordToken is None else multiwordToken[9]
+
+			tokenRange = _getCoNLLUTokenRange(locationMisc)
+			if tokenRange is None:
+				if not multiwordToken is None and i > 0 and sentence[i-1][10] is multiwordToken:
+					tokenRange = (tokens[-1][3],tokens[-1][4])
+				else:
+					startPos = text.find(location,position)
+					assert startPos >= 0 and text[position:startPos].strip() == '', "Could not find token '%s' in document text at position %d" % (location,position)
+					tokenRange = (startPos,startPos+len(location))
+			startPos,endPos = tokenRange
+			assert text[startPos:endPos] == location, "Token '%s' does not match the document text at %d:%d" % (location,startPos,endPos)
+			position = endPos
+
+			tokens.append((form, lemma if lemma != '_' else '', upos if upos != '_' else '', startPos, endPos))
+			if head != '_':
+				head = int(head)
+				dependencies.append((head-1 if head > 0 else i, i, deprel))
+
+		parsedSentences.append((tokens,dependencies))
+	return parsedSentences
+
+def loadParses(dataFormat,path,corpus):
+	"""
+	Load previously parsed data (e.g. from an existing pipeline) into the documents of a corpus instead of parsing them with a Parser. The parses must be for the documents of the corpus in the same order. The entities of each document are aligned to the tokens in the same way as the Parser. The 'docbin' format is a serialized Spacy DocBin (which needs Spacy 2.2 or later) and the text of each Spacy document must match the document. The 'conllu' format is a CoNLL-U file with documents started by "# newdoc" comments (or a single document if there are none). Character offsets are taken from TokenRange=start:end in the MISC field if given, otherwise each word is found in the document text.
+
+	:param dataFormat: Format of the parsed data ('docbin' or 'conllu')
+	:param path: Path to the parsed data
+	:param corpus: Corpus containing the documents that were parsed
+	:type dataFormat: str
+	:type path: str
+	:type corpus: kindred.Corpus
+	"""
+	assert dataFormat == 'docbin' or dataFormat == 'conllu'
+	assert os.path.isfile(path), "%s must exist" % path
+	assert isinstance(corpus,kindred.Corpus)
+
+	from kindred.Parser import _addSentencesToDocument
+
+	documentCount = 0
+	if dataFormat == 'docbin':
+		for d,(text,parsedSentences) in zip(corpus.documents,_iterDocBinParses(path)):
+			assert text == d.text, "Text of parsed document (%s) does not match the corpus document (%s)" % (text[:50],d.text[:50])
+			_addSentencesToDocument(d,parsedSentences,corpus._getStringTable())
+			documentCount += 1
+	elif dataFormat == 'conllu':
+		for d,sentences in zip(corpus.documents,_iterCoNLLUDocuments(path)):
+			_addSentencesToDocument(d,_alignCoNLLUDocument(d.text,sentences),corpus._getStringTable())
+			documentCount += 1
+
+	assert documentCount == len(corpus.documents), "Only found parses for %d of the %d documents in the corpus" % (documentCount,len(corpus.documents))
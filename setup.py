@@ -5,10 +5,13 @@ from setuptools import setup, find_packages
 from codecs import open
 from os import path
 
-VERSION='2.0.1'
-
 here = path.abspath(path.dirname(__file__))
 
+# Get the version from the package (without importing it and its dependencies)
+with open(path.join(here, 'kindred', 'version.py'), encoding='utf-8') as f:
+	exec(f.read())
+VERSION = __version__
+
 # Get the long description from the README file
 with open(path.join(here, 'README.rst'), encoding='utf-8') as f:
 	long_description = f.read()
@@ -0,0 +1,91 @@
+# Benchmarks comparing the current implementations with previous ones. These print timings (instead of making assertions)
+# so they are not part of the tests. Run with: python tests/benchmarks.py
+
+import kindred
+import random
+import time
+
+from kindred.Parser import _alignEntitiesToTokens
+from test_alignment import _generateDocument
+
+def _alignWithIntervalTree(entities,tokenPositions):
+	# The previous approach (one IntervalTree query per token)
+	from intervaltree import IntervalTree
+	denotationTree = IntervalTree()
+	for e in entities:
+		for a,b in e.position:
+			if b > a:
+				denotationTree[a:b] = e.entityID
+	return [ [ interval.data for interval in denotationTree[tokenStart:tokenEnd] ] for tokenStart,tokenEnd in tokenPositions ]
+
+def benchmarkAlignment():
+	rng = random.Random(1)
+	entities,tokenPositions = _generateDocument(rng,tokenCount=5000,entityCount=500)
+
+	# intervaltree is no longer a requirement of kindred so the comparison is only run if it is installed
+	try:
+		import intervaltree
+	except ImportError:
+		intervaltree = None
+
+	if intervaltree is None:
+		print("IntervalTree: skipped (pip install intervaltree to compare with it)")
+	else:
+		start = time.time()
+		for _ in range(10):
+			_alignWithIntervalTree(entities,tokenPositions)
+		intervalTreeTime = (time.time() - start) / 10
+		print("IntervalTree: %.4fs per document" % intervalTreeTime)
+
+	start = time.time()
+	for _ in range(10):
+		_alignEntitiesToTokens(entities,tokenPositions)
+	sweepTime = (time.time() - start) / 10
+
+	print("Sweep:        %.4fs per document" % sweepTime)
+
+class _DictToken(object):
+	# The previous Token (with its attributes in a __dict__) to compare memory use with
+	def __init__(self,word,lemma,partofspeech,startPos,endPos):
+		self.word,self.lemma,self.partofspeech,self.startPos,self.endPos = word,lemma,partofspeech,startPos,endPos
+
+class _DictEntity(object):
+	# The previous Entity (with its attributes in a __dict__)
+	def __init__(self,entityType,text,position,sourceEntityID=None,externalID=None):
+		self.entityType,self.sourceEntityID,self.externalID,self.text,self.position = entityType,sourceEntityID,externalID,text,position
+		self.entityID = 0
+
+class _DictRelation(object):
+	# The previous Relation (with its attributes in a __dict__)
+	def __init__(self,relationType=None,entityIDs=[],argNames=None):
+		self.relationType,self.entityIDs = relationType,entityIDs
+		self.argNames = None if argNames is None else [ str(a) for a in argNames ]
+
+def _getBytesPerObject(createObject,count):
+	# Memory allocated (as measured by tracemalloc) for each object, including the lists and ints that it holds
+	import gc
+	import tracemalloc
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	objects = [ createObject(i) for i in range(count) ]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	assert len(objects) == count
+	return (after - before) / float(count)
+
+def benchmarkMemory():
+	count = 100000
+	comparisons = [
+		('Token', lambda i : _DictToken('word','lemma','NOUN',i,i+4), lambda i : kindred.Token('word','lemma','NOUN',i,i+4)),
+		('Entity', lambda i : _DictEntity('drug','Erlotinib',[(i,i+9)],'T1'), lambda i : kindred.Entity('drug','Erlotinib',[(i,i+9)],'T1')),
+		('Relation', lambda i : _DictRelation('treats',[i,i+1],['obj','subj']), lambda i : kindred.Relation('treats',[i,i+1],['obj','subj'])),
+	]
+	for name,createDictObject,createObject in comparisons:
+		dictBytes = _getBytesPerObject(createDictObject,count)
+		slotsBytes = _getBytesPerObject(createObject,count)
+		print("%-9s %5.0f bytes per object with __dict__, %5.0f with __slots__" % (name,dictBytes,slotsBytes))
+
+if __name__ == '__main__':
+	benchmarkAlignment()
+	benchmarkMemory()
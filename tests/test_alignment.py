@@ -0,0 +1,44 @@
+import kindred
+import random
+
+from kindred.Parser import _alignEntitiesToTokens
+
+def _generateDocument(rng,tokenCount,entityCount):
+	tokenPositions = []
+	pos = 0
+	for _ in range(tokenCount):
+		pos += rng.randint(0,2)
+		length = rng.randint(0,8)
+		tokenPositions.append((pos,pos+length))
+		pos += length
+
+	entities = []
+	for _ in range(entityCount):
+		position = []
+		for _ in range(rng.randint(1,3)):
+			start = rng.randint(0,pos)
+			position.append((start,start+rng.randint(0,20)))
+		entities.append(kindred.Entity('type','text',position))
+
+	return entities,tokenPositions
+
+def _bruteForceAlignment(entities,tokenPositions):
+	# Empty tokens don't overlap with anything
+	spans = sorted(set( (a,b,e.entityID) for e in entities for a,b in e.position if b > a ))
+	return [ [ entityID for a,b,entityID in spans if a < tokenEnd and b > tokenStart and tokenStart < tokenEnd ] for tokenStart,tokenEnd in tokenPositions ]
+
+def test_alignment_matchesBruteForce():
+	rng = random.Random(1)
+	for _ in range(50):
+		entities,tokenPositions = _generateDocument(rng,rng.randint(0,200),rng.randint(0,50))
+
+		aligned = _alignEntitiesToTokens(entities,tokenPositions)
+		expected = _bruteForceAlignment(entities,tokenPositions)
+
+		assert [ sorted(ids) for ids in aligned ] == [ sorted(ids) for ids in expected ]
+
+def test_alignment_splitEntity():
+	# Entity with two spans that both overlap the same token
+	e = kindred.Entity('cancer','lung cancers',[(0,4),(5,12)])
+	aligned = _alignEntitiesToTokens([e],[(0,12),(13,15)])
+	assert aligned == [[e.entityID,e.entityID],[]]
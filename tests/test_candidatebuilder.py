@@ -1,4 +1,5 @@
 import kindred
+import math
 
 from kindred.datageneration import generateData,generateTestData
 	
@@ -26,6 +27,180 @@ def test_simpleRelationCandidates():
 	assert candidateRelations[2].entityIDs == [sourceEntityIDsToEntityIDs['3'], sourceEntityIDsToEntityIDs['4']]
 	assert candidateRelations[3].entityIDs == [sourceEntityIDsToEntityIDs['4'], sourceEntityIDsToEntityIDs['3']]
 
+def test_acceptedEntityPairs():
+	text = '<drug id="1">Erlotinib</drug> and <gene id="2">EGFR</gene> with <drug id="3">gefitinib</drug> for <cancer id="4">NSCLC</cancer> and <cancer id="5">lung cancer</cancer>.'
+
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	kindred.Parser(backend='simple').parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder(acceptedEntityPairs=[('drug','cancer'),('cancer','drug'),('drug','drug')])
+	candidateBuilder.fit_transform(corpus)
+
+	entityIDsToSourceEntityIDs = corpus.documents[0].getEntityIDsToSourceEntityIDs()
+	candidates = [ tuple( entityIDsToSourceEntityIDs[eID] for eID in r.entityIDs ) for r in corpus.getCandidateRelations() ]
+
+	# The candidates are in the same order as all the permutations of the entities
+	assert candidates == [('1','3'),('1','4'),('1','5'),('3','1'),('3','4'),('3','5'),('4','1'),('4','3'),('5','1'),('5','3')]
+
+def _getCandidateSourceIDs(corpus):
+	entityIDsToSourceEntityIDs = corpus.documents[0].getEntityIDsToSourceEntityIDs()
+	return [ tuple( entityIDsToSourceEntityIDs[eID] for eID in r.entityIDs ) for r in corpus.getCandidateRelations() ]
+
+def test_pruneByTokenDistanceAndCap():
+	text = '<drug id="1">Erlotinib</drug> <cancer id="2">NSCLC</cancer> a b c <gene id="3">EGFR</gene> d <drug id="4">aspirin</drug>. <relation type="treats" subj="1" obj="2" /><relation type="treats" subj="1" obj="4" />'
+
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	kindred.Parser(backend='simple').parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder(maxTokenDistance=3)
+	candidateBuilder.fit_transform(corpus)
+	assert _getCandidateSourceIDs(corpus) == [('1','2'),('2','1'),('3','4'),('4','3')]
+	assert candidateBuilder.getPrunedCounts() == {'maxTokenDistance':(8,1)}
+
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	kindred.Parser(backend='simple').parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder(maxCandidatesPerSentence=3)
+	candidateBuilder.fit_transform(corpus)
+	assert _getCandidateSourceIDs(corpus) == [('1','2'),('2','1'),('3','4')]
+	assert candidateBuilder.getPrunedCounts() == {'maxCandidatesPerSentence':(9,1)}
+
+def test_pruneByDependencyPathLength():
+	text = 'mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,w,'',0,0) for w in text.split() ]
+	dependencies = [(1,0,'nsubj'),(1,3,'dobj'),(3,2,'amod')]
+	e1 = kindred.Entity('gene','mutations',[(0,9)])
+	e2 = kindred.Entity('disease','dangerous',[(16,25)])
+	e3 = kindred.Entity('disease','cancer',[(26,32)])
+
+	doc = kindred.Document(text,entities=[e1,e2,e3],relations=[],relationsUseSourceIDs=False)
+	sentence = kindred.Sentence(text,tokens,dependencies,[(e1,[0]),(e2,[2]),(e3,[3])])
+	doc.addSentence(sentence)
+	doc.parsedText = doc.text
+	corpus = kindred.Corpus()
+	corpus.addDocument(doc)
+
+	candidateBuilder = kindred.CandidateBuilder(maxDependencyPathLength=2)
+	candidateBuilder.fit_transform(corpus)
+
+	candidates = [ tuple(r.entityIDs) for r in corpus.getCandidateRelations() ]
+	assert candidates == [(e1.entityID,e3.entityID),(e2.entityID,e3.entityID),(e3.entityID,e1.entityID),(e3.entityID,e2.entityID)]
+	assert candidateBuilder.getPrunedCounts() == {'maxDependencyPathLength':(2,0)}
+
+def test_negativeSampling():
+	def buildCandidates(**kwargs):
+		corpus = generateData(positiveCount=50,negativeCount=200)
+		kindred.Parser(backend='simple').parse(corpus)
+		candidateBuilder = kindred.CandidateBuilder(**kwargs)
+		candidateBuilder.fit_transform(corpus)
+		return corpus,corpus.getCandidateSet()
+
+	def getPositions(corpus,candidateSet):
+		# Entity IDs are different for each generated corpus, so identify the candidates by their documents and source entity IDs
+		positions = []
+		for docIndex,entityIDs in zip(candidateSet.documentIndices.tolist(),candidateSet.entityIDs.tolist()):
+			entityIDsToSourceEntityIDs = corpus.documents[docIndex].getEntityIDsToSourceEntityIDs()
+			positions.append((docIndex,tuple( entityIDsToSourceEntityIDs[eID] for eID in entityIDs )))
+		return positions
+
+	fullCorpus,fullSet = buildCandidates()
+	fullClasses = fullSet.getFirstClasses()
+	negativeCount = (fullClasses == 0).sum()
+
+	corpus,sampledSet = buildCandidates(negativeFraction=0.25)
+	sampledClasses = sampledSet.getFirstClasses()
+	assert (sampledClasses != 0).sum() == (fullClasses != 0).sum()
+	assert (sampledClasses == 0).sum() == int(math.ceil(0.25 * negativeCount))
+	assert abs(sampledSet.weights[sampledClasses == 0].sum() - negativeCount) < 1e-6
+	assert (sampledSet.weights[sampledClasses != 0] == 1.0).all()
+	assert len(corpus.getCandidateRelations()) == len(sampledSet)
+
+	# The sampling is seeded so gives the same candidates each time
+	corpusAgain,sampledAgain = buildCandidates(negativeFraction=0.25)
+	assert getPositions(corpusAgain,sampledAgain) == getPositions(corpus,sampledSet)
+
+	_,ratioSet = buildCandidates(negativeRatio=1)
+	ratioClasses = ratioSet.getFirstClasses()
+	assert (ratioClasses == 0).sum() == (ratioClasses != 0).sum()
+
+	# Stratified sampling keeps at least one negative for each combination of entity types
+	def getNegativeTypePairs(corpus,candidateSet):
+		entityMapping = corpus.getEntityMapping()
+		return [ tuple( entityMapping[eID].entityType for eID in entityIDs ) for entityIDs,c in zip(candidateSet.entityIDs.tolist(),candidateSet.getFirstClasses().tolist()) if c == 0 ]
+
+	stratifiedCorpus,stratifiedSet = buildCandidates(negativeFraction=0.001,stratifyNegatives=True)
+	expectedTypePairs = sorted(set(getNegativeTypePairs(fullCorpus,fullSet)))
+	assert sorted(getNegativeTypePairs(stratifiedCorpus,stratifiedSet)) == expectedTypePairs
+
+	# Rounding up each group still keeps the total within the ratio
+	positiveCount = (fullClasses != 0).sum()
+	for negativeRatio in [0.01,0.5,1.5]:
+		_,stratifiedRatioSet = buildCandidates(negativeRatio=negativeRatio,stratifyNegatives=True)
+		stratifiedRatioClasses = stratifiedRatioSet.getFirstClasses()
+		assert (stratifiedRatioClasses != 0).sum() == positiveCount
+		assert (stratifiedRatioClasses == 0).sum() == int(math.floor(negativeRatio * positiveCount))
+
+def test_negativeSamplingWithoutPositives():
+	# With no positive candidates there is nothing to keep a ratio of negatives to, so they are all kept
+	corpus = generateData(positiveCount=50,negativeCount=200)
+	corpus.removeRelations()
+	kindred.Parser(backend='simple').parse(corpus)
+	kindred.CandidateBuilder(negativeRatio=1).fit_transform(corpus)
+
+	candidateSet = corpus.getCandidateSet()
+	assert len(candidateSet) > 0
+	assert (candidateSet.getFirstClasses() == 0).all()
+	assert (candidateSet.weights == 1.0).all()
+
+def test_negativeSamplingForTraining():
+	trainCorpus, testCorpusGold = generateTestData(positiveCount=100,negativeCount=100)
+	for corpus in [trainCorpus,testCorpusGold]:
+		kindred.Parser(backend='simple').parse(corpus)
+
+	predictionCorpus = testCorpusGold.clone()
+	predictionCorpus.removeRelations()
+	kindred.Parser(backend='simple').parse(predictionCorpus)
+
+	classifier = kindred.RelationClassifier(features=['entityTypes','unigramsBetweenEntities','bigrams'],negativeFraction=0.5)
+	classifier.train(trainCorpus)
+	classifier.predict(predictionCorpus)
+
+	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
+	assert f1score > 0.9
+
+def test_parallelCandidates():
+	trainCorpus, testCorpus = generateTestData(positiveCount=50,negativeCount=50)
+
+	def buildCandidates(nWorkers):
+		corpora = [ trainCorpus.clone(), testCorpus.clone() ]
+		for corpus in corpora:
+			kindred.Parser(backend='simple').parse(corpus)
+		candidateBuilder = kindred.CandidateBuilder(maxTokenDistance=5,maxCandidatesPerSentence=3)
+		candidateBuilder.fit_transform(corpora[0],nWorkers=nWorkers)
+		candidateBuilder.transform(corpora[1],nWorkers=nWorkers)
+		return corpora[0],corpora[1],candidateBuilder.getPrunedCounts()
+
+	serial = buildCandidates(1)
+	parallel = buildCandidates(2)
+
+	for serialCorpus,parallelCorpus in zip(serial[:2],parallel[:2]):
+		serialSet,parallelSet = serialCorpus.getCandidateSet(),parallelCorpus.getCandidateSet()
+		assert len(serialSet) > 0
+		assert parallelSet.documentIndices.tolist() == serialSet.documentIndices.tolist()
+		assert parallelSet.sentenceIndices.tolist() == serialSet.sentenceIndices.tolist()
+		assert parallelSet.entityIDs.tolist() == serialSet.entityIDs.tolist()
+		assert parallelSet.getClasses() == serialSet.getClasses()
+
+		serialCounts = [ sentence.getCandidateCount() for doc in serialCorpus.documents for sentence in doc.sentences ]
+		parallelCounts = [ sentence.getCandidateCount() for doc in parallelCorpus.documents for sentence in doc.sentences ]
+		assert parallelCounts == serialCounts
+
+	assert len(serial[2]) > 0
+	assert parallel[2] == serial[2]
+
 if __name__ == '__main__':
 	test_simpleRelationCandidates()
 
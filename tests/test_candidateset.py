@@ -0,0 +1,39 @@
+import kindred
+
+def test_candidateset_relationsAndClasses():
+	candidateSet = kindred.CandidateSet([0,0,1],[0,0,2],[(1,2),(2,1),(5,6)],[[0],[1,2],[0]])
+
+	assert len(candidateSet) == 3
+	assert candidateSet.getRelations() == [kindred.Relation(entityIDs=[1,2]),kindred.Relation(entityIDs=[2,1]),kindred.Relation(entityIDs=[5,6])]
+	assert candidateSet.getRelation(2) == kindred.Relation(entityIDs=[5,6])
+	assert candidateSet.getClasses() == [[0],[1,2],[0]]
+	assert candidateSet.getClassesForCandidate(1) == [1,2]
+	assert candidateSet.getFirstClasses().tolist() == [0,1,0]
+
+def test_candidateset_fromCandidateBuilder():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>. <relation type="treats" subj="1" obj="2" />'
+
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	kindred.Parser(backend='simple').parse(corpus)
+	kindred.CandidateBuilder().fit_transform(corpus)
+
+	candidateSet = corpus.getCandidateSet()
+	assert corpus.getCandidateSet() is candidateSet
+	assert candidateSet.documentIndices.tolist() == [0,0,0,0]
+	assert candidateSet.sentenceIndices.tolist() == [0,0,1,1]
+	assert candidateSet.getClasses() == [[0],[1],[0],[0]]
+
+	sentences = corpus.documents[0].sentences
+	assert [ sentence.getCandidateCount() for sentence in sentences ] == [2,2]
+	assert [ r for r,_ in sentences[1].candidateRelationsWithClasses ] == candidateSet.getRelations()[2:]
+
+	# Adding a candidate by hand means a new set is made from the sentences
+	e1,e2 = sentences[0].getEntityIDs()
+	sentences[0].addCandidateRelation(kindred.Relation(entityIDs=[e1,e1]),[0])
+
+	updatedSet = corpus.getCandidateSet()
+	assert not updatedSet is candidateSet
+	assert updatedSet.sentenceIndices.tolist() == [0,0,0,1,1]
+	assert updatedSet.getRelations()[2] == kindred.Relation(entityIDs=[e1,e1])
+	assert updatedSet.getClasses() == [[0],[1],[0],[0],[0]]
@@ -1,4 +1,5 @@
 import kindred
+import pytest
 from collections import Counter
 
 def test_corpus_split():
@@ -53,3 +54,31 @@ def test_corpus_nfold_split():
 	for doc,count in testCounter.items():
 		assert count == folds
 
+
+def test_corpus_internsStrings():
+	text = "<drug id='1'>Erlotinib</drug> treats <disease id='2'>NSCLC</disease>. <drug id='3'>Aspirin</drug> treats <disease id='4'>boneitis</disease>.<relation type='treats' drug='1' disease='2' /><relation type='treats' drug='3' disease='4' />"
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	corpus.addDocument(kindred.Document(text))
+
+	kindred.Parser(backend='simple').parse(corpus)
+
+	entities = [ e for doc in corpus.documents for e in doc.entities ]
+	relations = [ r for doc in corpus.documents for r in doc.relations ]
+	tokens = [ t for doc in corpus.documents for s in doc.sentences for t in s.tokens ]
+
+	assert all( e.entityType is corpus.stringTable.intern('drug') for e in entities if e.entityType == 'drug' )
+	assert all( r.relationType is relations[0].relationType for r in relations )
+	assert all( r.argNames[0] is relations[0].argNames[0] for r in relations )
+	treatsTokens = [ t for t in tokens if t.word == 'treats' ]
+	assert len(treatsTokens) == 4
+	assert all( t.word is treatsTokens[0].word for t in treatsTokens )
+
+def test_corpus_setParsed():
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.')
+	assert not corpus.parsed
+
+	# Setting parsed (as older code did) is ignored with a warning
+	with pytest.warns(DeprecationWarning):
+		corpus.parsed = True
+	assert not corpus.parsed
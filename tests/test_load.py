@@ -1,4 +1,8 @@
 import os
+import tempfile
+import shutil
+import numpy
+import pytest
 
 import kindred
 
@@ -228,3 +232,94 @@ def test_loadStandoffFile_extraLines(capfd):
 if __name__ == '__main__':
 	test_loadBiocFile()
 
+
+def test_loadParses_conllu():
+	text1 = 'Erlotinib treats NSCLC. It works.'
+	text2 = "Aspirin can't cure boneitis."
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text1,entities=[kindred.Entity('drug','Erlotinib',[(0,9)],'T1'),kindred.Entity('cancer','NSCLC',[(17,22)],'T2')],relations=[]))
+	corpus.addDocument(kindred.Document(text2,entities=[kindred.Entity('drug','Aspirin',[(0,7)],'T1')],relations=[]))
+
+	conllu = [
+		'# newdoc id = doc1',
+		'# text = Erlotinib treats NSCLC.',
+		'1\tErlotinib\terlotinib\tPROPN\t_\t_\t2\tnsubj\t_\t_',
+		'2\ttreats\ttreat\tVERB\t_\t_\t0\troot\t_\t_',
+		'3\tNSCLC\tNSCLC\tPROPN\t_\t_\t2\tobj\t_\tSpaceAfter=No',
+		'4\t.\t.\tPUNCT\t_\t_\t2\tpunct\t_\t_',
+		'',
+		'1\tIt\tit\tPRON\t_\t_\t2\tnsubj\t_\tTokenRange=24:26',
+		'2\tworks\twork\tVERB\t_\t_\t0\troot\t_\tTokenRange=27:32',
+		'3\t.\t.\tPUNCT\t_\t_\t2\tpunct\t_\tTokenRange=32:33',
+		'',
+		'# newdoc id = doc2',
+		'1\tAspirin\taspirin\tPROPN\t_\t_\t3\tnsubj\t_\t_',
+		'2-3\tcan\'t\t_\t_\t_\t_\t_\t_\t_\t_',
+		'2\tca\tcan\tAUX\t_\t_\t4\taux\t_\t_',
+		'3\tn\'t\tnot\tPART\t_\t_\t4\tadvmod\t_\t_',
+		'4\tcure\tcure\tVERB\t_\t_\t0\troot\t_\t_',
+		'5\tboneitis\tboneitis\tNOUN\t_\t_\t4\tobj\t_\tSpaceAfter=No',
+		'6\t.\t.\tPUNCT\t_\t_\t4\tpunct\t_\t_',
+		'',
+	]
+	tempDir = tempfile.mkdtemp()
+	path = os.path.join(tempDir,'parses.conllu')
+	with open(path,'w') as f:
+		f.write("\n".join(conllu))
+
+	kindred.loadParses('conllu',path,corpus)
+	shutil.rmtree(tempDir)
+	assert corpus.parsed
+
+	doc1,doc2 = corpus.documents
+	assert [ s.text for s in doc1.sentences ] == ['Erlotinib treats NSCLC.','It works.']
+	assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in doc1.sentences[1].tokens ] == [('It','it','PRON',24,26),('works','work','VERB',27,32),('.','.','PUNCT',32,33)]
+	assert doc1.sentences[0].dependencies == [(1,0,'nsubj'),(1,1,'root'),(1,2,'obj'),(1,3,'punct')]
+	assert [ (e.sourceEntityID,locs) for e,locs in doc1.sentences[0].entitiesWithLocations ] == [('T1',[0]),('T2',[2])]
+
+	assert [ (t.word,t.startPos,t.endPos) for t in doc2.sentences[0].tokens ] == [('Aspirin',0,7),('ca',8,13),("n't",8,13),('cure',14,18),('boneitis',19,27),('.',27,28)]
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateBuilder.fit_transform(corpus)
+	assert len(corpus.getCandidateRelations()) == 2
+
+def test_loadParses_docbin():
+	from spacy.tokens import Doc
+	from spacy.vocab import Vocab
+	from spacy.attrs import HEAD,DEP
+	try:
+		from spacy.tokens import DocBin
+	except ImportError:
+		pytest.skip("DocBin needs Spacy 2.2 or later")
+
+	text = 'Erlotinib treats NSCLC. It works.'
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text,entities=[kindred.Entity('drug','Erlotinib',[(0,9)],'T1'),kindred.Entity('cancer','NSCLC',[(17,22)],'T2')],relations=[]))
+
+	words = ['Erlotinib','treats','NSCLC','.','It','works','.']
+	spaces = [True,True,False,True,True,False,False]
+	heads = [1,1,1,1,5,5,5]
+	deps = ['nsubj','ROOT','dobj','punct','nsubj','ROOT','punct']
+
+	# The heads and dependency types are set with from_array (as older versions of Spacy can't take them in the Doc constructor)
+	vocab = Vocab()
+	doc = Doc(vocab,words=words,spaces=spaces)
+	relativeHeads = numpy.array([ head-i for i,head in enumerate(heads) ],dtype='int64').view('uint64')
+	depIDs = numpy.array([ vocab.strings.add(dep) for dep in deps ],dtype='uint64')
+	parseArray = numpy.stack([relativeHeads,depIDs],axis=1)
+	doc.from_array([HEAD,DEP],parseArray)
+	docBin = DocBin()
+	docBin.add(doc)
+	tempDir = tempfile.mkdtemp()
+	path = os.path.join(tempDir,'parses.spacy')
+	docBin.to_disk(path)
+
+	kindred.loadParses('docbin',path,corpus)
+	shutil.rmtree(tempDir)
+	assert corpus.parsed
+
+	sentences = corpus.documents[0].sentences
+	assert [ s.text for s in sentences ] == ['Erlotinib treats NSCLC.','It works.']
+	assert sentences[0].dependencies == [(1,0,'nsubj'),(1,1,'ROOT'),(1,2,'dobj'),(1,3,'punct')]
+	assert sentences[1].dependencies == [(1,0,'nsubj'),(1,1,'ROOT'),(1,2,'punct')]
+	assert [ (e.sourceEntityID,locs) for e,locs in sentences[0].entitiesWithLocations ] == [('T1',[0]),('T2',[2])]
@@ -0,0 +1,132 @@
+import kindred
+import shutil
+import tempfile
+
+from kindred.datageneration import generateData
+
+def _getSentenceInfo(corpus):
+	info = []
+	for doc in corpus.documents:
+		for sentence in doc.sentences:
+			tokens = [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in sentence.tokens ]
+			entityLocs = [ (e.sourceEntityID,locs) for e,locs in sentence.entitiesWithLocations ]
+			info.append((sentence.text,tokens,sentence.dependencies,entityLocs))
+	return info
+
+def test_parsecache_warmRun():
+	tempDir = tempfile.mkdtemp()
+	try:
+		coldCorpus = generateData(positiveCount=10,negativeCount=10)
+		warmCorpus = generateData(positiveCount=10,negativeCount=10)
+		docCount = len(coldCorpus.documents)
+
+		cache = kindred.ParseCache(tempDir)
+		parser = kindred.Parser(cache=cache)
+		parser.parse(coldCorpus)
+		assert cache.hits == 0
+		assert cache.misses == docCount
+
+		cache = kindred.ParseCache(tempDir)
+		parser = kindred.Parser(cache=cache)
+		parser.parse(warmCorpus)
+		assert cache.hits == docCount
+		assert cache.misses == 0
+
+		assert _getSentenceInfo(coldCorpus) == _getSentenceInfo(warmCorpus)
+	finally:
+		shutil.rmtree(tempDir)
+
+def test_parsecache_eviction():
+	tempDir = tempfile.mkdtemp()
+	try:
+		cache = kindred.ParseCache(tempDir,maxSize=5000)
+
+		parsedSentences = [ ([('word','word','NOUN',0,4)] * 20, [(0,0,'ROOT')] * 20) ]
+		for i in range(100):
+			cache.put('text %d' % i,'model',parsedSentences)
+			assert cache.currentSize <= 5000
+
+		assert cache.get('text 99','model') == parsedSentences
+		assert cache.get('text 0','model') is None
+		assert cache.get('text 99','othermodel') is None
+		assert cache.hits == 1
+		assert cache.misses == 2
+
+		cache.clear()
+		assert cache.get('text 99','model') is None
+		assert cache.currentSize == 0
+	finally:
+		shutil.rmtree(tempDir)
+
+def test_parsecache_replaceEntry():
+	tempDir = tempfile.mkdtemp()
+	try:
+		cache = kindred.ParseCache(tempDir)
+
+		parsedSentences = [ ([('word','word','NOUN',0,4)] * 20, [(0,0,'ROOT')] * 20) ]
+		cache.put('text','model',parsedSentences)
+		sizeAfterOne = cache.currentSize
+		cache.put('text','model',parsedSentences)
+		assert cache.currentSize == sizeAfterOne
+		assert cache.get('text','model') == parsedSentences
+	finally:
+		shutil.rmtree(tempDir)
+
+def test_parsecache_unreadableEntry():
+	tempDir = tempfile.mkdtemp()
+	try:
+		cache = kindred.ParseCache(tempDir)
+
+		parsedSentences = [ ([('word','word','NOUN',0,4)], [(0,0,'ROOT')]) ]
+		cache.put('text','model',parsedSentences)
+
+		# An entry that refers to a module that can't be imported (e.g. written by a different version) is a miss
+		with open(cache._getPath('text','model'),'wb') as f:
+			f.write(b'cnonexistentmodule\nThing\n.')
+		assert cache.get('text','model') is None
+		assert cache.hits == 0
+		assert cache.misses == 1
+	finally:
+		shutil.rmtree(tempDir)
+
+def test_parsecache_warmRunWithoutLoadingModel():
+	import spacy
+	import sys
+	spacyBackendModule = sys.modules['kindred.SpacyBackend']
+
+	# A small Spacy pipeline saved to disk stands in for an installed model
+	tempDir = tempfile.mkdtemp()
+	originalFindPath = spacyBackendModule._findSpacyModelPath
+	originalLoaded = dict(spacyBackendModule._loadedModels)
+	try:
+		modelDir = tempDir + '/model'
+		nlp = spacy.blank('en')
+		if spacy.__version__.startswith('2.'):
+			nlp.add_pipe(nlp.create_pipe('sentencizer'))
+		else:
+			nlp.add_pipe('sentencizer')
+		nlp.to_disk(modelDir)
+		spacyBackendModule._findSpacyModelPath = lambda language : modelDir
+		spacyBackendModule._loadedModels.pop('en',None)
+
+		corpus = generateData(positiveCount=5,negativeCount=5)
+		cacheDir = tempDir + '/cache'
+		cache = kindred.ParseCache(cacheDir)
+		parser = kindred.Parser(cache=cache)
+		modelName = parser._getModelName()
+		for doc in corpus.documents:
+			cache.put(doc.text,modelName,list(kindred.SimpleBackend().parseTexts([doc.text],1))[0])
+
+		cache = kindred.ParseCache(cacheDir)
+		kindred.Parser(cache=cache).parse(corpus)
+		assert cache.hits == len(corpus.documents)
+		assert not 'en' in spacyBackendModule._loadedModels
+
+		# The name from the installed model's metadata matches the name once the model is loaded
+		spacyBackendModule._loadedModels['en'] = spacy.load(modelDir, disable=['ner'])
+		assert parser._getModelName() == modelName
+	finally:
+		spacyBackendModule._findSpacyModelPath = originalFindPath
+		spacyBackendModule._loadedModels.clear()
+		spacyBackendModule._loadedModels.update(originalLoaded)
+		shutil.rmtree(tempDir)
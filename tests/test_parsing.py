@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*- 
 import os
+import pickle
 
 import kindred
+import pytest
 from kindred.datageneration import generateData,generateTestData
 
 def assertEntityWithLocation(entityWithLocation,expectedType,expectedLocs,expectedSourceEntityID):
@@ -171,7 +173,312 @@ def test_unicodeParse():
 	assert isinstance(sentence.dependencies,list)
 	assert len(sentence.dependencies) > 0
 
+def _getSentenceInfo(corpus):
+	info = []
+	for doc in corpus.documents:
+		sourceEntityIDs = doc.getEntityIDsToSourceEntityIDs()
+		for sentence in doc.sentences:
+			tokens = [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in sentence.tokens ]
+			entityLocs = [ (sourceEntityIDs[e.entityID],locs) for e,locs in sentence.entitiesWithLocations ]
+			info.append((sentence.text,tokens,sentence.dependencies,entityLocs))
+	return info
+
+def test_batchedParse():
+	corpusA = generateData(positiveCount=20,negativeCount=20)
+	corpusB = generateData(positiveCount=20,negativeCount=20)
+
+	parser = kindred.Parser()
+	parser.parse(corpusA,batchSize=1)
+	parser.parse(corpusB,batchSize=7)
+
+	assert len(corpusA.documents) == len(corpusB.documents)
+	for docA,docB in zip(corpusA.documents,corpusB.documents):
+		assert len(docA.sentences) > 0
+		assert docA.text == docB.text
+	assert _getSentenceInfo(corpusA) == _getSentenceInfo(corpusB)
+
+def test_parallelParse():
+	corpusA = generateData(positiveCount=20,negativeCount=20)
+	corpusB = generateData(positiveCount=20,negativeCount=20)
+
+	parser = kindred.Parser()
+	parser.parse(corpusA)
+	parser.parse(corpusB,batchSize=3,nWorkers=2)
+
+	assert corpusB.parsed
+	for docA,docB in zip(corpusA.documents,corpusB.documents):
+		assert len(docA.sentences) > 0
+		assert docA.text == docB.text
+	assert _getSentenceInfo(corpusA) == _getSentenceInfo(corpusB)
+
+def test_incrementalParse():
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.')
+	assert not corpus.parsed
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+	assert corpus.parsed
+
+	firstDoc = corpus.documents[0]
+	firstSentences = list(firstDoc.sentences)
+	assert len(firstSentences) == 1
+
+	newDoc = kindred.Document('<drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>.')
+	corpus.addDocument(newDoc)
+	assert not corpus.parsed
+	assert not newDoc.isParsed()
+
+	parser.parse(corpus)
+	assert corpus.parsed
+	assert firstDoc.sentences == firstSentences
+	assert firstDoc.sentences[0] is firstSentences[0]
+	assert len(newDoc.sentences) == 1
+
+	# Parsing again should not duplicate the sentences
+	parser.parse(corpus)
+	assert firstDoc.sentences == firstSentences
+	assert len(newDoc.sentences) == 1
+
+	# But changing the text means that the document needs reparsing
+	newDoc.text = 'Aspirin is the main cause of boneitis. It is also a treatment for headaches.'
+	assert not corpus.parsed
+	parser.parse(corpus)
+	assert [ s.text for s in newDoc.sentences ] == ['Aspirin is the main cause of boneitis.','It is also a treatment for headaches.']
+
+def test_sharedModel():
+	kindred.preloadSpacyModel('en')
+
+	parserA = kindred.Parser()
+	parserB = kindred.Parser()
+	assert parserA.nlp is parserB.nlp
+
+def test_parseWithoutDependencyFeatures():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>.'
+	fullCorpus = kindred.Corpus(text)
+	lightCorpus = kindred.Corpus(text)
+
+	kindred.Parser().parse(fullCorpus)
+	kindred.Parser(features=['entityTypes','unigramsBetweenEntities']).parse(lightCorpus)
+
+	fullSentences = fullCorpus.documents[0].sentences
+	lightSentences = lightCorpus.documents[0].sentences
+	assert len(lightSentences) == 2
+	for fullSentence,lightSentence in zip(fullSentences,lightSentences):
+		assert [ t.word for t in fullSentence.tokens ] == [ t.word for t in lightSentence.tokens ]
+		assert [ (e.sourceEntityID,loc) for e,loc in fullSentence.entitiesWithLocations ] == [ (e.sourceEntityID,loc) for e,loc in lightSentence.entitiesWithLocations ]
+		assert lightSentence.dependencies == []
+
+def test_chunkedParse():
+	singleSentence = '<drug id="ID1">Erlotinib</drug> is a common treatment for <cancer id="ID2">lung cancer</cancer>.'
+	text = " ".join( [ singleSentence.replace('ID1',str(2*i)).replace('ID2',str(2*i+1)) for i in range(50) ] )
+	fullCorpus = kindred.Corpus(text)
+	chunkedCorpus = kindred.Corpus(text)
+
+	kindred.Parser().parse(fullCorpus)
+	kindred.Parser(maxChunkLength=200).parse(chunkedCorpus)
+
+	doc = chunkedCorpus.documents[0]
+	assert len(doc.sentences) == 50
+	for sentence in doc.sentences:
+		for t in sentence.tokens:
+			assert doc.text[t.startPos:t.endPos] == t.word
+
+	assert _getSentenceInfo(fullCorpus) == _getSentenceInfo(chunkedCorpus)
+
+def test_parseEntitySentencesOnly():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. It is not the only one. <drug id="3">Aspirin</drug> is taken for headaches.'
+	fullCorpus = kindred.Corpus(text)
+	entityCorpus = kindred.Corpus(text)
+
+	kindred.Parser().parse(fullCorpus)
+	kindred.Parser(parseEntitySentencesOnly=True).parse(entityCorpus)
+
+	fullSentences = fullCorpus.documents[0].sentences
+	entitySentences = entityCorpus.documents[0].sentences
+	assert len(entitySentences) == 3
+
+	# The sentence with two entities is fully parsed
+	assert _getSentenceInfo(fullCorpus)[0] == _getSentenceInfo(entityCorpus)[0]
+
+	# The others only have tokens
+	for fullSentence,entitySentence in zip(fullSentences[1:],entitySentences[1:]):
+		assert [ (t.word,t.startPos,t.endPos) for t in fullSentence.tokens ] == [ (t.word,t.startPos,t.endPos) for t in entitySentence.tokens ]
+		assert entitySentence.dependencies == []
+
+	kindred.CandidateBuilder().fit_transform(entityCorpus)
+	assert len(entityCorpus.getCandidateRelations()) == 2
+
+def test_simpleBackend():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> (e.g. 3.5 mg) is the main cause of <disease id="4">boneitis</disease>!\n\nA new paragraph'
+	corpus = kindred.Corpus(text)
+
+	parser = kindred.Parser(features=['entityTypes','unigramsBetweenEntities'],backend='simple')
+	parser.parse(corpus)
+
+	doc = corpus.documents[0]
+	sentences = doc.sentences
+	assert [ s.text for s in sentences ] == ['Erlotinib is a common treatment for NSCLC.','Aspirin (e.g. 3.5 mg) is the main cause of boneitis!','A new paragraph']
+	assert [ t.word for t in sentences[1].tokens ] == ['Aspirin','(','e','.','g','.','3.5','mg',')','is','the','main','cause','of','boneitis','!']
+	for sentence in sentences:
+		assert sentence.dependencies == []
+		for t in sentence.tokens:
+			assert doc.text[t.startPos:t.endPos] == t.word
+
+	assert [ [ (e.sourceEntityID,loc) for e,loc in s.entitiesWithLocations ] for s in sentences ] == [[('1',[0]),('2',[6])],[('3',[0]),('4',[14])],[]]
+
+def test_simpleBackendNeedsNoDependencies():
+	with pytest.raises(AssertionError):
+		kindred.Parser(features=['dependencyPathEdges'],backend='simple')
+
+def test_customBackend():
+	class WholeTextBackend(kindred.ParserBackend):
+		def parseTexts(self,texts,batchSize,entitySpans=None):
+			for text in texts:
+				tokens = [ (text,'','',0,len(text)) ] if text else []
+				yield [ (tokens,[]) ]
+
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> treats <cancer id="2">NSCLC</cancer>.')
+	kindred.Parser(backend=WholeTextBackend()).parse(corpus)
+
+	sentences = corpus.documents[0].sentences
+	assert len(sentences) == 1
+	assert [ t.word for t in sentences[0].tokens ] == ['Erlotinib treats NSCLC.']
+	assert [ (e.sourceEntityID,loc) for e,loc in sentences[0].entitiesWithLocations ] == [('1',[0]),('2',[0])]
+
+	# The empty sentence given back for a blank document is skipped
+	corpus.addDocument(kindred.Document(''))
+	kindred.Parser(backend=WholeTextBackend()).parse(corpus)
+	assert corpus.documents[1].sentences == []
+	assert len(corpus.documents[0].sentences) == 1
+
+def test_characterBudgetBatches():
+	class RecordingBackend(kindred.SimpleBackend):
+		def __init__(self):
+			self.batches = []
+		def parseTexts(self,texts,batchSize,entitySpans=None):
+			self.batches.append(texts)
+			return kindred.SimpleBackend.parseTexts(self,texts,batchSize,entitySpans)
+
+	lengths = [1,50,3,200,7,1000,20,5]
+	texts = [ " ".join( "Sentence %d is here." % j for j in range(length) ) for length in lengths ]
+	corpus = kindred.Corpus()
+	for text in texts:
+		corpus.addDocument(kindred.Document(text,entities=[],relations=[]))
+	expectedCorpus = kindred.Corpus()
+	for text in texts:
+		expectedCorpus.addDocument(kindred.Document(text,entities=[],relations=[]))
+
+	backend = RecordingBackend()
+	kindred.Parser(backend=backend).parse(corpus,maxBatchCharacters=2000)
+	kindred.Parser(backend='simple').parse(expectedCorpus)
+
+	assert len(backend.batches) > 1
+	for batch in backend.batches:
+		assert sum( len(text) for text in batch ) <= 2000
+		assert [ len(text) for text in batch ] == sorted([ len(text) for text in batch ],reverse=True)
+
+	assert _getSentenceInfo(corpus) == _getSentenceInfo(expectedCorpus)
+
+def test_parseIter():
+	texts = [ '<drug id="1">Drug%d</drug> is a treatment for <cancer id="2">cancer%d</cancer>. Nothing else here.' % (i,i) for i in range(25) ]
+
+	readCount = [0]
+	def generateDocuments():
+		for text in texts:
+			readCount[0] += 1
+			yield kindred.Document(text)
+
+	parser = kindred.Parser(backend='simple')
+	parsedDocs = []
+	for doc in parser.parseIter(generateDocuments(),lookahead=10):
+		assert readCount[0] <= len(parsedDocs) + 10
+		assert doc.isParsed()
+		parsedDocs.append(doc)
+
+	expectedCorpus = kindred.Corpus()
+	for text in texts:
+		expectedCorpus.addDocument(kindred.Document(text))
+	parser.parse(expectedCorpus)
+
+	parsedCorpus = kindred.Corpus()
+	for doc in parsedDocs:
+		parsedCorpus.addDocument(doc)
+
+	assert len(parsedDocs) == 25
+	assert [ d.text for d in parsedDocs ] == [ d.text for d in expectedCorpus.documents ]
+	assert _getSentenceInfo(parsedCorpus) == _getSentenceInfo(expectedCorpus)
+
+def test_parseIterStringTables():
+	texts = [ '<drug id="1">Drug%d</drug> is a treatment for <cancer id="2">cancer%d</cancer>.' % (i,i) for i in range(20) ]
+
+	# Normal sentences only share interned strings within each group of documents, so the Parser doesn't keep every string
+	parser = kindred.Parser(backend='simple')
+	docs = list(parser.parseIter(( kindred.Document(text) for text in texts ),lookahead=10))
+	assert parser.stringTable is None
+	assert docs[0].sentences[0].tokens[3].word == "treatment"
+	assert docs[0].sentences[0].tokens[3].word is docs[1].sentences[0].tokens[3].word
+
+	# Columnar sentences need a table that lasts as long as they do
+	parser = kindred.Parser(backend='simple',columnarSentences=True)
+	docs = list(parser.parseIter(( kindred.Document(text) for text in texts ),lookahead=10))
+	assert all( doc.sentences[0].stringTable is parser.stringTable for doc in docs )
+
+def test_columnarSentences():
+	corpusA = generateData(positiveCount=20,negativeCount=20)
+	corpusB = generateData(positiveCount=20,negativeCount=20)
+
+	kindred.Parser(backend='simple').parse(corpusA)
+	kindred.Parser(backend='simple',columnarSentences=True).parse(corpusB)
+
+	assert _getSentenceInfo(corpusA) == _getSentenceInfo(corpusB)
+	for doc in corpusB.documents:
+		for sentence in doc.sentences:
+			assert isinstance(sentence,kindred.ColumnarSentence)
+			assert sentence.stringTable is corpusB.stringTable
+			assert sentence.tokens[-1].word == sentence.tokens[len(sentence.tokens)-1].word
+			assert [ t.word for t in sentence.tokens[1:3] ] == [ t.word for t in list(sentence.tokens)[1:3] ]
+
+	# Pickling keeps the shared string table
+	unpickled = pickle.loads(pickle.dumps(corpusB))
+	assert _getSentenceInfo(unpickled) == _getSentenceInfo(corpusA)
+
+	features = ['entityTypes','unigramsBetweenEntities','bigrams']
+	for corpus in [corpusA,corpusB]:
+		kindred.CandidateBuilder().fit_transform(corpus)
+	matrixA = kindred.Vectorizer(featureChoice=features).fit_transform(corpusA)
+	matrixB = kindred.Vectorizer(featureChoice=features).fit_transform(corpusB)
+	assert (matrixA != matrixB).nnz == 0
+
+def test_extractSentencesMatchesTokens():
+	from kindred.SpacyBackend import _extractSpacySentences
+
+	text = u'Erlotinib is a common treatment for NSCLC. Aspirin is the main cause of boneitis in Zürich.\n\nIt is also a treatment for headaches.'
+	parser = kindred.Parser()
+	parsed = parser.nlp(text)
+
+	expected = []
+	for spacySentence in parsed.sents:
+		tokens = [ (t.text,t.lemma_,t.pos_,t.idx,t.idx+len(t.text)) for t in spacySentence ]
+		dependencies = [ (t.head.i-spacySentence.start,t.i-spacySentence.start,t.dep_) for t in spacySentence ]
+		expected.append((tokens,dependencies))
+
+	assert _extractSpacySentences(parsed,{}) == expected
+	assert _extractSpacySentences(parser.nlp(u''),{}) == []
+
 if __name__ == '__main__':
 	#test_largeSentence()
 	test_parsing_dependencyGraph()
 	
+
+def test_splitTextIntoChunks():
+	from kindred.Parser import _splitTextIntoChunks
+
+	# Hard-wrapped text is split at the end of a sentence rather than at a line break in the middle of one
+	text = "The first sentence is wrapped\nover a line. The second sentence\nfollows here and\nends in this column. The third sentence is here."
+	chunks = _splitTextIntoChunks(text,110)
+	assert [ chunkText for _,chunkText in chunks ] == ["The first sentence is wrapped\nover a line. The second sentence\nfollows here and\nends in this column. ","The third sentence is here."]
+	assert all( text[chunkStart:chunkStart+len(chunkText)] == chunkText for chunkStart,chunkText in chunks )
+
+	# A paragraph break is used before the end of a sentence, and a line break is used if there is no sentence end
+	assert [ chunkText for _,chunkText in _splitTextIntoChunks("One. Two\n\nThree. Four. Five",15) ] == ["One. Two\n\n","Three. Four. ","Five"]
+	assert [ chunkText for _,chunkText in _splitTextIntoChunks("one two\nthree four",12) ] == ["one two\n","three four"]
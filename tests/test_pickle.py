@@ -24,3 +24,101 @@ def test_pickle():
 	
 	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
 	assert f1score == 1.0
+
+def test_pickle_datatypes():
+	token = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
+	entity = kindred.Entity(entityType="drug",text="Erlotinib",position=[(0,9)],sourceEntityID="T1",externalID="id:1234")
+	relation = kindred.Relation(relationType="causes",entityIDs=[1,2],argNames=["drug","disease"])
+
+	for o in [token,entity,relation]:
+		assert not hasattr(o,'__dict__')
+		for protocol in range(pickle.HIGHEST_PROTOCOL+1):
+			assert pickle.loads(pickle.dumps(o,protocol=protocol)) == o
+
+def test_pickle_datatypesFromDictionaries():
+	# Objects pickled before these classes used slots have their attributes stored as a dictionary
+	entity = kindred.Entity.__new__(kindred.Entity)
+	entity.__setstate__({'entityType':'drug','text':'Erlotinib','position':[(0,9)],'sourceEntityID':'T1','externalID':None,'entityID':5})
+
+	assert str(entity) == "<Entity drug:'Erlotinib' id=5 sourceid=T1 [(0, 9)]>"
+
+def test_pickle_documentFromDictionary():
+	# Documents pickled before they tracked their parsed text and quarantine reason don't have these attributes
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <relation type="treats" subj="1" obj="2" />'
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document(text))
+	kindred.Parser(backend='simple').parse(corpus)
+
+	doc = corpus.documents[0]
+	state = dict(doc.__dict__)
+	del state['parsedText']
+	del state['quarantineReason']
+	oldDoc = kindred.Document.__new__(kindred.Document)
+	oldDoc.__dict__.update(state)
+	corpus.documents[0] = pickle.loads(pickle.dumps(oldDoc))
+
+	assert corpus.documents[0].isParsed()
+	assert corpus.documents[0].quarantineReason is None
+	assert corpus.parsed
+
+	kindred.CandidateBuilder().fit_transform(corpus)
+	assert len(corpus.getCandidateRelations()) == 2
+
+def test_pickle_sentenceFromDictionary():
+	# Sentences pickled before they referred to the document text stored their own text and a list of candidate relations
+	text = 'Erlotinib treats NSCLC'
+	entity1 = kindred.Entity('drug','Erlotinib',[(0,9)])
+	entity2 = kindred.Entity('cancer','NSCLC',[(17,22)])
+	e1,e2 = entity1.entityID,entity2.entityID
+	tokens = [ kindred.Token(w,w,'NOUN',text.index(w),text.index(w)+len(w)) for w in text.split() ]
+	candidate = kindred.Relation(entityIDs=[e1,e2])
+	oldState = {'text':text,'tokens':tokens,'entitiesWithLocations':[(entity1,[0]),(entity2,[2])],'sourceFilename':None,'dependencies':[(1,0,'nsubj'),(1,2,'dobj')],'entityIDToType':{e1:'drug',e2:'cancer'},'entityIDToLoc':{e1:[0],e2:[2]},'candidateRelationsWithClasses':[(candidate,[1])],'candidateRelationsProcessed':True}
+
+	sentence = kindred.Sentence.__new__(kindred.Sentence)
+	sentence.__setstate__(oldState)
+	sentence = pickle.loads(pickle.dumps(sentence))
+
+	assert sentence.text == text
+	assert sentence.candidateRelationsWithClasses == [(candidate,[1])]
+	assert sentence.getCandidateCount() == 1
+
+	sentence.addCandidateRelation(kindred.Relation(entityIDs=[e2,e1]),[0])
+	assert sentence.getCandidateCount() == 2
+
+def test_pickle_corpusWithoutStringTable():
+	# Corpora pickled before they had a string table get one when it is needed
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.')
+	del corpus.stringTable
+	corpus = pickle.loads(pickle.dumps(corpus))
+
+	corpus.addDocument(kindred.Document('<drug id="1">Aspirin</drug> treats <disease id="2">headaches</disease>.'))
+	kindred.Parser(backend='simple').parse(corpus)
+	assert isinstance(corpus.stringTable,kindred.StringTable)
+	assert corpus.documents[1].entities[0].entityType is corpus.stringTable.intern('drug')
+
+def test_pickle_classifierFromDictionary():
+	# Classifiers pickled before options were added to them (and their candidate builder and vectorizer) don't have those attributes
+	trainCorpus, testCorpusGold = generateTestData(positiveCount=20,negativeCount=20)
+	predictionCorpus = testCorpusGold.clone()
+	predictionCorpus.removeRelations()
+	for corpus in [trainCorpus,predictionCorpus]:
+		kindred.Parser(backend='simple').parse(corpus)
+
+	classifier = kindred.RelationClassifier(features=['entityTypes','unigramsBetweenEntities','bigrams'],acceptedEntityPairs=[('drug','disease'),('disease','drug')])
+	classifier.train(trainCorpus)
+
+	newAttributes = [ (classifier,['limits','negativeFraction','negativeRatio','stratifyNegatives','randomSeed']), (classifier.candidateBuilder,['limits','acceptedPartnerTypes','maxTokenDistance','maxDependencyPathLength','maxCandidatesPerSentence','prunedCounts','negativeFraction','negativeRatio','stratifyNegatives','randomSeed']), (classifier.vectorizer,['limits']) ]
+	for obj,attributeNames in newAttributes:
+		for attributeName in attributeNames:
+			del obj.__dict__[attributeName]
+
+	classifier = pickle.loads(pickle.dumps(classifier))
+	assert classifier.candidateBuilder.getPrunedCounts() == {}
+	classifier.predict(predictionCorpus)
+	assert len(predictionCorpus.getRelations()) > 0
+
+	# And the old candidate builder can still build candidates for training
+	candidateBuilder = pickle.loads(pickle.dumps(classifier.candidateBuilder))
+	candidateBuilder.fitted = False
+	candidateBuilder.fit_transform(trainCorpus)
+	assert len(trainCorpus.getCandidateRelations()) > 0
@@ -0,0 +1,95 @@
+import kindred
+
+class _ExpiredLimits(kindred.ProcessingLimits):
+	def getDeadline(self):
+		return 0
+
+def _makeCorpus():
+	corpus = kindred.Corpus()
+	corpus.addDocument(kindred.Document('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.'))
+	corpus.addDocument(kindred.Document('<drug id="1">Aspirin</drug> and <drug id="2">ibuprofen</drug> and <drug id="3">paracetamol</drug> all treat <disease id="4">headaches</disease>.'))
+	corpus.addDocument(kindred.Document('A much longer document without any entities. ' * 20))
+	return corpus
+
+def test_processingLimits_maxCharacters():
+	corpus = _makeCorpus()
+	limits = kindred.ProcessingLimits(maxCharacters=200)
+	kindred.Parser(backend='simple',limits=limits).parse(corpus)
+
+	assert corpus.parsed
+	quarantined = corpus.getQuarantinedDocuments()
+	assert len(quarantined) == 1
+	doc,reason = quarantined[0]
+	assert doc is corpus.documents[2]
+	assert reason == "Document has %d characters (limit is 200)" % len(doc.text)
+	assert doc.sentences == []
+	assert len(corpus.documents[0].sentences) == 1
+
+	# Quarantined documents are skipped in later parses
+	kindred.Parser(backend='simple').parse(corpus)
+	assert doc.sentences == []
+
+def test_processingLimits_maxSentenceEntities():
+	corpus = _makeCorpus()
+	kindred.Parser(backend='simple').parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder(limits=kindred.ProcessingLimits(maxSentenceEntities=3))
+	candidateBuilder.fit_transform(corpus)
+
+	assert [ (doc,reason) for doc,reason in corpus.getQuarantinedDocuments() ] == [(corpus.documents[1],"Sentence 0 has 4 entities (limit is 3)")]
+	assert len(corpus.getCandidateRelations()) == 2
+
+def test_processingLimits_maxSentenceTokens():
+	corpus = _makeCorpus()
+	limits = kindred.ProcessingLimits(maxSentenceTokens=8)
+	kindred.Parser(backend='simple',limits=limits).parse(corpus)
+
+	assert [ doc for doc,_ in corpus.getQuarantinedDocuments() ] == [corpus.documents[1]]
+
+def test_processingLimits_maxSeconds():
+	corpus = _makeCorpus()
+	kindred.Parser(backend='simple').parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder(limits=_ExpiredLimits(maxSeconds=1))
+	candidateBuilder.fit_transform(corpus)
+
+	quarantined = corpus.getQuarantinedDocuments()
+	assert len(quarantined) == 3
+	assert all( reason == "Ran out of time building candidate relations (limit is 1 seconds)" for _,reason in quarantined )
+	assert corpus.getCandidateRelations() == []
+
+def _addDependencyChain(sentence):
+	sentence.dependencies = [ (i,i+1,'dep') for i in range(len(sentence.tokens)-1) ]
+
+def test_processingLimits_maxSecondsForDependencyPaths():
+	corpus = _makeCorpus()
+	kindred.Parser(backend='simple').parse(corpus)
+	kindred.CandidateBuilder().fit_transform(corpus)
+	candidateSet = corpus.getCandidateSet()
+
+	# Only the first document has dependencies (and so paths to find) and it runs out of time
+	_addDependencyChain(corpus.documents[0].sentences[0])
+
+	vectorizer = kindred.Vectorizer(featureChoice=['entityTypes','dependencyPathEdges','dependencyPathEdgesNearEntities'],limits=_ExpiredLimits(maxSeconds=1))
+	matrix = vectorizer.fit_transform(corpus).tocsr()
+
+	quarantined = corpus.getQuarantinedDocuments()
+	assert quarantined == [(corpus.documents[0],"Ran out of time finding dependency paths (limit is 1 seconds)")]
+	assert corpus.documents[0].sentences == []
+
+	# Its candidates are given empty rows while the others are vectorized as normal
+	assert matrix.shape[0] == len(candidateSet)
+	rowCounts = matrix.getnnz(axis=1).tolist()
+	assert all( (count == 0) == (docIndex == 0) for docIndex,count in zip(candidateSet.documentIndices.tolist(),rowCounts) )
+
+def test_processingLimits_dependencyPathsWithinTime():
+	corpus = _makeCorpus()
+	kindred.Parser(backend='simple').parse(corpus)
+	kindred.CandidateBuilder().fit_transform(corpus)
+	_addDependencyChain(corpus.documents[0].sentences[0])
+
+	vectorizer = kindred.Vectorizer(featureChoice=['dependencyPathEdges'],limits=kindred.ProcessingLimits(maxSeconds=60))
+	matrix = vectorizer.fit_transform(corpus).tocsr()
+
+	assert corpus.getQuarantinedDocuments() == []
+	assert matrix.getnnz(axis=1).tolist()[:2] == [1,1]
@@ -1,4 +1,5 @@
 import kindred
+import pytest
 
 def test_sentence_noDependencyInfo(capfd):
 	text = 'mutations cause dangerous cancer'
@@ -34,6 +35,15 @@ def test_sentence_workingDependencyPath(capfd):
 	assert nodes == set([2,3,5])
 	assert edges == set([(2, 3, 'a'), (3, 5, 'b')])
 
+def test_sentence_dependencyPathDeadline():
+	text = 'lots of mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
+
+	s = kindred.Sentence(text,tokens,dependencies=[(2,3,'a'),(3,5,'b'),(4,5,'c')],entitiesWithLocations=[])
+
+	with pytest.raises(kindred.ProcessingLimitExceeded):
+		s.extractMinSubgraphContainingNodes([2,5],deadline=0)
+
 def test_sentence_entitiesWithLocations(capfd):
 	text = 'lots of mutations cause dangerous cancer'
 	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
@@ -76,3 +86,42 @@ def test_sentence_addEntityWithLocations(capfd):
 	assert s.getEntityType(e1.entityID) == 'thingA'
 	assert s.getEntityType(e2.entityID) == 'thingB'
 
+
+def test_sentence_textOffsets():
+	documentText = 'Erlotinib treats NSCLC. Aspirin causes boneitis.'
+	tokens = [ kindred.Token('Aspirin',None,None,24,31), kindred.Token('causes',None,None,32,38), kindred.Token('boneitis',None,None,39,47), kindred.Token('.',None,None,47,48) ]
+
+	s = kindred.Sentence(documentText,tokens,dependencies=[],entitiesWithLocations=[],textOffsets=(24,48))
+	assert s.text == 'Aspirin causes boneitis.'
+	assert s.documentText is documentText
+
+	s.text = 'Something else'
+	assert s.text == 'Something else'
+	assert (s.textStart,s.textEnd) == (0,14)
+
+	with pytest.raises(AssertionError):
+		kindred.Sentence(documentText,tokens,dependencies=[],entitiesWithLocations=[],textOffsets=(24,100))
+
+def test_sentence_textSharedWithDocument():
+	corpus = kindred.Corpus('Erlotinib treats NSCLC. Aspirin causes boneitis.')
+	kindred.Parser(backend='simple').parse(corpus)
+
+	doc = corpus.documents[0]
+	assert [ s.text for s in doc.sentences ] == ['Erlotinib treats NSCLC.','Aspirin causes boneitis.']
+	for s in doc.sentences:
+		assert s.documentText is doc.text
+
+def test_sentence_createTrusted():
+	text = 'mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
+	dependencies = [(0,1,'a'),(2,3,'b')]
+	e = kindred.Entity('disease','cancer',[(26,32)])
+
+	s1 = kindred.Sentence(text,tokens,dependencies,[(e,[3])])
+	s2 = kindred.Sentence._createTrusted(text,tokens,dependencies,[(e,[3])])
+	assert s1.__dict__ == s2.__dict__
+
+	# The checks are only done by the normal constructor
+	with pytest.raises(AssertionError):
+		kindred.Sentence(text,tokens,dependencies,[(e,[7])])
+	kindred.Sentence._createTrusted(text,tokens,dependencies,[(e,[7])])
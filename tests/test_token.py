@@ -9,3 +9,12 @@ def test_token_repr():
 	t = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
 
 	assert t.__repr__()  == "hat"
+
+def test_token_equals():
+	t1 = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
+	t2 = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
+	t3 = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=4,endPos=7)
+
+	assert t1 == t2
+	assert hash(t1) == hash(t2)
+	assert t1 != t3